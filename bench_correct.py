@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+correct_excel kıyaslaması: satır başına tüm TXT maddelerini tarayan eski
+doğrudan eşleşme ile norm_tr(terim) indeksi arasındaki farkı ölçer.
+
+    python bench_correct.py --txt ciktiafull.txt --xlsx sozlukafull.xlsx
+"""
+import time
+import argparse
+
+import correct_excel
+from sozluk import norm_tr, RATIO_BACKENDS
+
+
+def _timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--txt", default=str(correct_excel.TXT_PATH))
+    ap.add_argument("--xlsx", default=str(correct_excel.XLSX_IN))
+    ap.add_argument("--bucket", default="A")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--backend", choices=RATIO_BACKENDS, default=correct_excel.SIM_BACKEND)
+    args = ap.parse_args()
+
+    with open(args.txt, "r", encoding="utf-8", errors="ignore") as f:
+        entries = correct_excel.txt_entries(f.read(), args.bucket)
+    df = correct_excel.load_a_sheet(args.xlsx)
+    keys = [norm_tr(str(k).strip()) for k in df["kelime"]]
+    print(f"{len(df)} Excel satırı × {len(entries)} TXT maddesi")
+
+    # ham (önbelleksiz) norm_tr ile eski tarama: satır × madde normalizasyon
+    raw_norm = norm_tr.__wrapped__
+    def scan():
+        return [[(t, d) for (t, d) in entries if raw_norm(t) == key] for key in keys]
+
+    def indexed():
+        term_map, _ = correct_excel.index_entries(entries)
+        return [term_map.get(key) or [] for key in keys]
+
+    t_scan, a = _timeit(scan, 1)
+    t_idx, b = _timeit(indexed, args.repeat)
+    assert a == b, "indeks sonucu tarama ile aynı olmalı"
+    print(f"doğrudan eşleşme, tarama : {t_scan:8.3f} s")
+    print(f"doğrudan eşleşme, indeks : {t_idx:8.3f} s  (x{t_scan / max(t_idx, 1e-9):.0f})")
+
+    t_all, (_, changes) = _timeit(lambda: correct_excel.correct_sheet(df.copy(), entries, args.backend), args.repeat)
+    print(f"correct_sheet ({args.backend:>9}): {t_all:8.3f} s  ({len(changes)} düzeltme)")
+
+
+if __name__ == "__main__":
+    main()
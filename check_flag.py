@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+flag.py kısayollarının tam çalıştırmayla aynı sonucu verdiğinin denetimi: üretilen
+(rastgele ama tohumlu) eski / yeni sözlükler üzerinde
+  - threshold taraması, her threshold için update_and_flag'in sayfa bazlı sayılarıyla,
+  - artımlı çalışma (--manifest), yeni sözlük her turda biraz değiştirilerek, aynı
+    girdilerle tam çalıştırmanın çıktı ve _ambiguous çalışma kitaplarıyla
+karşılaştırılır.
+
+    python check_flag.py --seed 1 --rows 200
+"""
+import os
+import random
+import argparse
+import tempfile
+
+from openpyxl import Workbook, load_workbook
+
+import flag
+from sozluk import SIM_METHODS
+from sozluk.excel import NEEDED_HEADERS
+
+LETTERS = ("A", "B", "Ç")
+# yakın başlıklar (ı/i, ş/s, ğ/g) ve tekrarlı başlıklar bol olsun diye küçük havuzlar
+STEMS = ("kın", "kin", "şma", "sma", "ğır", "gır", "ra", "rak", "lt")
+VOCAB = ("dava", "hak", "borç", "sözleşme", "miras", "tereke", "vekil", "ceza", "kanun", "tapu",
+         "ipotek", "rehin", "faiz", "hüküm", "yargı", "icra", "iflas", "şirket", "ortak", "pay")
+
+
+def random_def(rnd):
+    return " ".join(rnd.sample(VOCAB, rnd.randint(0, 6)))
+
+
+def random_head(rnd, letter):
+    # beşte biri seyrek başlık: eski sözlükte tek satırı olan ya da hiç olmayan kelimeler
+    if rnd.random() < 0.2:
+        return f"{letter.lower()}nadir{'abcdefghklmnoprtuvyz'[rnd.randrange(20)]}"
+    return letter.lower() + rnd.choice(STEMS)
+
+
+def write_old(path, rnd, rows):
+    """Eski sözlük: harf sayfaları, NEEDED_HEADERS başlıkları, R boş / 0 / 1 karışık."""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for letter in LETTERS:
+        ws = wb.create_sheet(letter)
+        ws.append(NEEDED_HEADERS)
+        for i in range(rows):
+            ws.append([rnd.choice((None, 0, 1)), random_head(rnd, letter), i, None,
+                       random_def(rnd), None])
+    wb.save(path)
+
+
+def random_new(rnd, rows):
+    return {letter: [(random_head(rnd, letter), random_def(rnd)) for _ in range(rows)]
+            for letter in LETTERS}
+
+
+def mutate(rnd, data):
+    """Yeni sözlükte birkaç küçük değişiklik: tanım düzeltme, ekleme, silme, yer değiştirme."""
+    data = {sheet: list(pairs) for sheet, pairs in data.items()}
+    for _ in range(rnd.randint(1, 6)):
+        letter = rnd.choice(LETTERS)
+        pairs = data[letter]
+        op = rnd.random()
+        if op < 0.4 and pairs:
+            i = rnd.randrange(len(pairs))
+            pairs[i] = (pairs[i][0], random_def(rnd))
+        elif op < 0.7:
+            pairs.insert(rnd.randint(0, len(pairs)), (random_head(rnd, letter), random_def(rnd)))
+        elif op < 0.85 and pairs:
+            pairs.pop(rnd.randrange(len(pairs)))
+        elif len(pairs) > 1:
+            i, j = rnd.sample(range(len(pairs)), 2)
+            pairs[i], pairs[j] = pairs[j], pairs[i]
+    return data
+
+
+def write_new(path, data):
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet, pairs in data.items():
+        ws = wb.create_sheet(sheet)
+        ws.append(["kelime", "anlam"])
+        for pair in pairs:
+            ws.append(list(pair))
+    wb.save(path)
+
+
+def ambiguous_counts(out_path):
+    """update_and_flag'in _ambiguous.xlsx'indeki sayfa başına aday satırı sayısı."""
+    path = flag._ambiguous_path(out_path)
+    counts = {}
+    if path.exists():
+        for row in load_workbook(path, read_only=True).active.iter_rows(min_row=2, values_only=True):
+            counts[row[0]] = counts.get(row[0], 0) + 1
+        os.remove(path)
+    return counts
+
+
+def dump(path):
+    if not os.path.exists(path):
+        return None
+    wb = load_workbook(path)
+    return {ws.title: [tuple(c.value for c in row) for row in ws.iter_rows()] for ws in wb}
+
+
+def check_incremental(tmp, rnd, old, data, rounds, method, thr, fuzzy=0, stream=False):
+    """
+    Her turda yeni sözlük değiştirilir; manifest'li çalışma tam çalışmayla aynı çıktıyı
+    vermeli, girdiler değişmeden tekrar çalıştırılınca da hiçbir şey yeniden yazılmamalı.
+    Döner: (toplam kelime, yeniden skorlanan kelime) — ilk tur hariç.
+    """
+    new = os.path.join(tmp, "inc_new.xlsx")
+    full, inc = os.path.join(tmp, "full.xlsx"), os.path.join(tmp, "inc.xlsx")
+    manifest = os.path.join(tmp, "inc.json.gz")
+    if os.path.exists(manifest):
+        os.remove(manifest)
+    opts = dict(sim_threshold=thr, sim_method=method, verbose=False, fuzzy=fuzzy, stream=stream)
+
+    scored = [0]
+    decide_sheet = flag.decide_sheet
+
+    def counting(target, words, *args, **kw):
+        scored[0] += len(words)
+        return decide_sheet(target, words, *args, **kw)
+
+    total = rescored = 0
+    for r in range(rounds):
+        if r:
+            data = mutate(rnd, data)
+        write_new(new, data)
+        for path in (full, inc):
+            if os.path.exists(flag._ambiguous_path(path)):
+                os.remove(flag._ambiguous_path(path))
+        want = flag.update_and_flag(old, new, full, **opts)
+        scored[0] = 0
+        flag.decide_sheet = counting
+        try:
+            got = flag.update_and_flag(old, new, inc, manifest_path=manifest, **opts)
+        finally:
+            flag.decide_sheet = decide_sheet
+        case = (method, thr, fuzzy, stream, r)
+        assert got == want, (case, got, want)
+        assert dump(inc) == dump(full), case
+        assert dump(flag._ambiguous_path(inc)) == dump(flag._ambiguous_path(full)), case
+        if r:
+            total += sum(st["total"] for st in want.values())
+            rescored += scored[0]
+
+        # değişmeyen girdiler: önceki sayılar döner, çıktıya dokunulmaz
+        mtime = os.stat(inc).st_mtime_ns
+        assert flag.update_and_flag(old, new, inc, manifest_path=manifest, **opts) == want, case
+        assert os.stat(inc).st_mtime_ns == mtime, case
+    return total, rescored
+
+
+def check_sweep(tmp, old, new, thresholds):
+    """sweep_thresholds satırları = her (metot, threshold) için tam update_and_flag sayıları."""
+    swept = flag.sweep_thresholds(old, new, thresholds)
+    out = os.path.join(tmp, "sweep.xlsx")
+    n = 0
+    for method in SIM_METHODS:
+        for thr in thresholds:
+            stats = flag.update_and_flag(old, new, out, thr, method, verbose=False)
+            amb = ambiguous_counts(out)
+            rows = {r["sheet"]: r for r in swept
+                    if r["method"] == method and r["threshold"] == thr and r["sheet"] != "*"}
+            assert set(rows) == set(stats), (method, thr, sorted(rows), sorted(stats))
+            for sheet, st in stats.items():
+                r = rows[sheet]
+                got = (r["total"], r["matched"], r["added"], r["ambiguous_rows"])
+                want = (st["total"], st["matched"], st["added"], amb.get(sheet, 0))
+                assert got == want, (method, thr, sheet, got, want)
+                assert r["single"] + r["duplicate"] == r["matched"], (method, thr, sheet, r)
+            n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="flag.py taramasının tam çalıştırmayla eşitlik denetimi")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--rows", type=int, default=100, help="Sayfa başına eski / yeni satır sayısı")
+    ap.add_argument("--rounds", type=int, default=6, help="Artımlı denetimde değişiklik turu")
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new = os.path.join(tmp, "old.xlsx"), os.path.join(tmp, "new.xlsx")
+        write_old(old, rnd, args.rows)
+        data = random_new(rnd, args.rows)
+        write_new(new, data)
+
+        n = check_sweep(tmp, old, new, [0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+        print(f"✔ threshold taraması: {n} (metot, threshold) tam çalıştırmayla aynı")
+
+        for method, thr, fuzzy, stream in (("jaccard", 0.5, 0, False), ("tfidf", 0.3, 0, True),
+                                           ("overlap", 0.6, 1.0, False)):
+            total, rescored = check_incremental(tmp, rnd, old, data, args.rounds, method, thr,
+                                                fuzzy, stream)
+            mode = f"{method} {thr}" + (f" fuzzy={fuzzy}" if fuzzy else "") + (" stream" if stream else "")
+            print(f"✔ artımlı ({mode}): {args.rounds} tur tam çalıştırmayla aynı; "
+                  f"değişiklik turlarında {total} kelimeden {rescored} yeniden skorlandı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sözlüğün kendi içindeki yakın tekrarlar: başlığı ve tanımı neredeyse aynı maddeleri
+kümeler (HukukSözlüğü.xlsx ya da sozlukafull.xlsx biçiminde herhangi bir dosya).
+
+İki madde, başlıklarının Türkçe ağırlıklı uzaklığı (tr_edit_distance) en çok
+--name-cost ve tanım benzerlikleri (jaccard ya da tfidf) en az --threshold ise
+bağlanır; kümeler bu bağların bileşenleridir (union-find). İkili tarama yapılmaz:
+- her sayfa (parça) ayrı süreçte işlenir: aynı başlıklı maddeler ve tanım MinHash-LSH
+  kovasını paylaşan maddeler aday olur,
+- sayfalar arası adaylar (ilk harfi bozulup başka sayfaya düşen tekrarlar) parçaların
+  döndürdüğü kova anahtarlarından bulunur.
+Kalabalık bir kovada / başlık grubunda adaylar başlık iskeletleri (tr_skeleton)
+üzerinde silme indeksiyle daraltılır. Tanımı boş maddeler kümelenmez.
+
+    python dedupe.py --xlsx HukukSözlüğü.xlsx --out tekrar_kumeleri.csv --workers 4
+"""
+import time
+import argparse
+from itertools import combinations, product
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import load_workbook
+
+from sozluk import (
+    MinHashLSH, CorpusStats, TfidfIndex, iter_dictionary_rows,
+    normalize_tr, tokenize_def, sim_jaccard, tr_edit_distance, tr_skeleton, deletes, write_table,
+)
+
+DEDUPE_METHODS = ("jaccard", "tfidf")
+CLUSTER_COLUMNS = ["cluster", "size", "sheet", "row", "kelime", "anlam", "score"]
+GROUP_PAIRS = 32    # bundan küçük gruplarda tüm çiftler aday, büyüklerde iskelet indeksi
+
+
+class Matcher:
+    """Aday çiftlerini üretir ve doğrular; hem parça süreçlerinde hem ana süreçte kullanılır."""
+
+    def __init__(self, method="jaccard", threshold=0.8, name_cost=1.0, tfidf=None,
+                 num_perm=32, bands=8):
+        self.method = method
+        self.threshold = threshold
+        self.name_cost = name_cost
+        self.tfidf = tfidf
+        self.lsh = MinHashLSH(num_perm, bands)
+
+    def pairs(self, members, heads):
+        """
+        members (madde numaraları) içinde başlıkları yeterince yakın olabilecek çiftler.
+        Küçük grupta hepsi; büyükte iskeletleri aynı ya da int(name_cost) silmeyle ortak bir
+        biçime inen çiftler (tr_skeleton'daki gerekçeyle hiçbir yakın çift kaçmaz).
+        """
+        if len(members) <= GROUP_PAIRS:
+            return combinations(members, 2)
+        by_skel = {}
+        for m in members:
+            by_skel.setdefault(tr_skeleton(heads[m]), []).append(m)
+        return self._skeleton_pairs(by_skel)
+
+    def _skeleton_pairs(self, by_skel):
+        # aynı iskelet + ortak silme biçimi olan iskeletler (uzaklık doğrulaması score'da)
+        for group in by_skel.values():
+            yield from combinations(group, 2)
+        shared = {}
+        for skel in by_skel:
+            for d in deletes(skel, int(self.name_cost)):
+                shared.setdefault(d, []).append(skel)
+        for skels in shared.values():
+            for s, t in combinations(skels, 2):
+                yield from product(by_skel[s], by_skel[t])
+
+    def score(self, head_a, head_b, tokens_a, tokens_b):
+        """Bağ skoru (tanım benzerliği) ya da None (tanım eşik altı / başlık uzak)."""
+        if self.method == "tfidf":
+            s = self.tfidf.cosine(tokens_a, tokens_b)
+        else:
+            s = sim_jaccard(tokens_a, tokens_b)
+        if s < self.threshold:
+            return None
+        if head_a != head_b and tr_edit_distance(head_a, head_b, self.name_cost) > self.name_cost:
+            return None
+        return s
+
+    def link(self, groups, heads, toks, uf, links, skip=None):
+        """
+        groups'taki aday çiftlerini doğrular, tutanları uf'de birleştirip links'e ekler.
+        Zaten aynı kümede olan çift doğrulanmaz (küme için bağ gerekmez), tamamı tek kümeye
+        düşmüş grup hiç açılmaz; reddedilen çift başka bir grupta tekrar denenmez.
+        skip(a, b) doğruysa çift atlanır.
+        """
+        rejected = set()
+        find = uf.find
+        for group in groups:
+            if len({find(m) for m in group}) == 1:
+                continue
+            for a, b in self.pairs(group, heads):
+                if skip is not None and skip(a, b):
+                    continue
+                if a > b:
+                    a, b = b, a
+                if find(a) == find(b) or (a, b) in rejected:
+                    continue
+                s = self.score(heads[a], heads[b], toks[a], toks[b])
+                if s is None:
+                    rejected.add((a, b))
+                else:
+                    uf.union(a, b)
+                    links.append((a, b, s))
+
+
+class UnionFind:
+    """Sözlük tabanlı union-find; kök her zaman kümenin en küçük elemanıdır."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _buckets(keys, band):
+    """keys'in band. grubuna göre kovalar: { anahtar: madde no ya da [madde no, ...] }."""
+    bucket = {}
+    for m, bk in keys:
+        key = bk[band]
+        cur = bucket.get(key)
+        if cur is None:
+            bucket[key] = m
+        elif cur.__class__ is int:
+            bucket[key] = [cur, m]
+        else:
+            cur.append(m)
+    return bucket
+
+
+_MATCHER = None
+
+
+def _init_worker(params):
+    global _MATCHER
+    _MATCHER = Matcher(**params)
+
+
+def shard_links(matcher, rows):
+    """
+    Bir parçanın (sayfa) maddeleri: [(madde no, kelime, anlam), ...]. Parça içi bağları
+    [(a, b, skor), ...] (kümeleri kuran bağlar; her çift değil) ve sayfalar arası aday
+    arama için [(madde no, kova anahtarları), ...] döndürür.
+    """
+    heads, toks, keys = {}, {}, []
+    by_head = {}
+    band_keys = matcher.lsh.band_keys
+    for m, kelime, anlam in rows:
+        tokens = tokenize_def(anlam)
+        if not tokens:
+            continue
+        heads[m] = head = normalize_tr(kelime)
+        toks[m] = tokens
+        by_head.setdefault(head, []).append(m)
+        keys.append((m, band_keys(tokens)))
+
+    groups = [g for g in by_head.values() if len(g) > 1]
+    for b in range(matcher.lsh.bands):
+        groups.extend(g for g in _buckets(keys, b).values() if g.__class__ is list)
+    links = []
+    matcher.link(groups, heads, toks, UnionFind(), links)
+    return links, keys
+
+
+def _shard_task(rows):
+    return shard_links(_MATCHER, rows)
+
+
+def cross_links(matcher, keys, shard_of, items, uf):
+    """
+    Parçaların kova anahtarlarından sayfalar arası bağlar (uf: parça içi bağlarla kurulmuş
+    kümeler). keys: [(madde no, anahtarlar)]; shard_of: madde no -> parça;
+    items: madde no -> (sayfa, satır, kelime, anlam).
+    """
+    heads, toks = {}, {}
+    groups = []
+    for b in range(matcher.lsh.bands):
+        bucket = _buckets(keys, b)
+        for group in bucket.values():
+            if group.__class__ is list and len({shard_of[m] for m in group}) > 1:
+                groups.append(group)
+                for m in group:
+                    if m not in heads:
+                        heads[m] = normalize_tr(items[m][2])
+                        toks[m] = tokenize_def(items[m][3])
+    links = []
+    matcher.link(groups, heads, toks, uf, links, skip=lambda a, b: shard_of[a] == shard_of[b])
+    return links
+
+
+def dedupe(items, method="jaccard", threshold=0.8, name_cost=1.0, tfidf=None, workers=1,
+           num_perm=32, bands=8):
+    """
+    items: [(sayfa, satır, kelime, anlam), ...] (iter_dictionary_rows). Parçalar sayfalardır.
+    Döner: (kümeler, bağlar); kümeler sıralı madde numarası listeleridir (ilk elemana göre
+    sıralı), sonuç workers'tan bağımsızdır.
+    """
+    params = {"method": method, "threshold": threshold, "name_cost": name_cost, "tfidf": tfidf,
+              "num_perm": num_perm, "bands": bands}
+    shards = {}
+    shard_of = {}
+    for m, (sheet, _, kelime, anlam) in enumerate(items):
+        shards.setdefault(sheet, []).append((m, kelime, anlam))
+        shard_of[m] = sheet
+
+    matcher = Matcher(**params)
+    tasks = list(shards.values())
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(params,)) as ex:
+            results = list(ex.map(_shard_task, tasks))
+    else:
+        results = [shard_links(matcher, rows) for rows in tasks]
+
+    uf = UnionFind()
+    links, keys = [], []
+    for part_links, part_keys in results:
+        for a, b, _ in part_links:
+            uf.union(a, b)
+        links.extend(part_links)
+        keys.extend(part_keys)
+    links.extend(cross_links(matcher, keys, shard_of, items, uf))
+
+    groups = {}
+    for a, b, _ in links:
+        for m in (a, b):
+            groups.setdefault(uf.find(m), set()).add(m)
+    return sorted(sorted(g) for g in groups.values()), links
+
+
+def cluster_rows(items, clusters, links):
+    """Rapor satırları; score: maddeyi kümeye bağlayan bağların en güçlüsü."""
+    best = {}
+    for a, b, s in links:
+        for m in (a, b):
+            if s > best.get(m, -1.0):
+                best[m] = s
+    rows = []
+    for cid, group in enumerate(sorted(clusters, key=lambda g: (-len(g), g[0])), start=1):
+        for m in group:
+            sheet, row, kelime, anlam = items[m]
+            rows.append({"cluster": cid, "size": len(group), "sheet": sheet, "row": row,
+                         "kelime": kelime, "anlam": anlam, "score": round(best.get(m, 0.0), 4)})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sözlük içindeki yakın tekrar maddeleri kümeler")
+    ap.add_argument("--xlsx", default="HukukSözlüğü.xlsx")
+    ap.add_argument("--out", default="dedupe_clusters.csv", help="Küme raporu (.csv ya da .json)")
+    ap.add_argument("--method", choices=DEDUPE_METHODS, default="jaccard")
+    ap.add_argument("--threshold", type=float, default=0.8, help="Tanım benzerliği eşiği (0-1)")
+    ap.add_argument("--name-cost", type=float, default=1.0,
+                    help="Başlıklar arası en büyük uzaklık (harf farkı 1, ı/i, ş/s gibi karışıklıklar 0.25)")
+    ap.add_argument("--workers", type=int, default=1, help="Süreç sayısı (sayfa başına bir parça)")
+    ap.add_argument("--perm", type=int, default=32, help="MinHash imza uzunluğu")
+    ap.add_argument("--bands", type=int, default=8, help="LSH grup sayısı (perm'in böleni)")
+    args = ap.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        ap.error("--threshold 0 ile 1 arasında olmalı")
+    if args.name_cost < 0:
+        ap.error("--name-cost negatif olamaz")
+    if args.perm % args.bands:
+        ap.error("--perm, --bands'in katı olmalı")
+
+    t0 = time.perf_counter()
+    wb = load_workbook(args.xlsx, read_only=True, data_only=True)
+    items = list(iter_dictionary_rows(wb))
+    tfidf = TfidfIndex.from_stats(CorpusStats.from_rows(items)) if args.method == "tfidf" else None
+    t1 = time.perf_counter()
+    print(f"{len(items)} madde okundu ({t1 - t0:.1f} s)")
+
+    clusters, links = dedupe(items, args.method, args.threshold, args.name_cost, tfidf,
+                             args.workers, args.perm, args.bands)
+    rows = cluster_rows(items, clusters, links)
+    write_table(rows, CLUSTER_COLUMNS, args.out)
+    print(f"✔ {len(clusters)} küme, {len(rows)} madde ({time.perf_counter() - t1:.1f} s): {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sayfalar arası yakın tekrar raporu: yeni sözlükteki her tanım için eski sözlüğün
+tüm sayfalarında Jaccard'ı eşiği geçen tanımları bulur (MinHash-LSH, sozluk.lsh).
+
+flag.py tanımları yalnız aynı hedef sayfada ve birebir aynı başlıkla karşılaştırır;
+ilk harfi OCR'da bozulup yanlış sayfaya düşen ya da başlığı farklı okunmuş tekrarlar
+orada hiç görülmez. Bu rapor varsayılan olarak sadece o kayıtları listeler
+(reason: other_sheet / other_headword); --all ile aynı başlıklı eşleşmeler de yazılır.
+
+    python dedupe_report.py --old HukukSözlüğü.xlsx --new sozlukafull.xlsx --out tekrarlar.csv
+"""
+import time
+import argparse
+
+from openpyxl import load_workbook
+
+from sozluk import (
+    MinHashLSH, iter_dictionary_rows, read_new_words, normalize_tr, tokenize_def, target_sheet,
+    write_table,
+)
+
+REPORT_COLUMNS = ["reason", "jaccard", "new_sheet", "kelime", "anlam",
+                  "old_sheet", "old_row", "old_kelime", "old_anlam"]
+
+
+def cross_sheet_duplicates(index, new_data, threshold=0.7, include_same=False):
+    """
+    new_data ({ sayfa: [(kelime, anlam), ...] }) tanımlarının index'teki (eski sözlük,
+    yük = (sayfa, satır, kelime, tanım)) yakın tekrarları; rapor satırları listesi.
+    """
+    rows = []
+    for sh, pairs in new_data.items():
+        for kelime, anlam in pairs:
+            tokens = tokenize_def(anlam)
+            if not tokens:
+                continue
+            target = target_sheet(kelime, sh)
+            norm = normalize_tr(kelime)
+            for k, score in index.query(tokens, threshold):
+                old_sheet, old_row, old_kelime, old_anlam = index.items[k]
+                if old_sheet != target:
+                    reason = "other_sheet"
+                elif normalize_tr(old_kelime) != norm:
+                    reason = "other_headword"
+                elif include_same:
+                    reason = "same_headword"
+                else:
+                    continue
+                rows.append({"reason": reason, "jaccard": round(score, 4),
+                             "new_sheet": sh, "kelime": kelime, "anlam": anlam,
+                             "old_sheet": old_sheet, "old_row": old_row,
+                             "old_kelime": old_kelime, "old_anlam": old_anlam})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Yeni sözlük tanımlarının eski sözlükte sayfalar arası yakın tekrarları")
+    ap.add_argument("--old", default="HukukSözlüğü.xlsx")
+    ap.add_argument("--new", default="sozlukafull.xlsx")
+    ap.add_argument("--out", default="dedupe_report.csv", help="Rapor (.csv ya da .json)")
+    ap.add_argument("--threshold", type=float, default=0.7, help="Jaccard eşiği (0-1)")
+    ap.add_argument("--all", action="store_true", help="Aynı sayfa ve başlıktaki eşleşmeleri de yaz")
+    ap.add_argument("--perm", type=int, default=32, help="MinHash imza uzunluğu")
+    ap.add_argument("--bands", type=int, default=8, help="LSH grup sayısı (perm'in böleni)")
+    args = ap.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        ap.error("--threshold 0 ile 1 arasında olmalı")
+    if args.perm % args.bands:
+        ap.error("--perm, --bands'in katı olmalı")
+
+    t0 = time.perf_counter()
+    wb = load_workbook(args.old, read_only=True, data_only=True)
+    index = MinHashLSH.from_rows(iter_dictionary_rows(wb), num_perm=args.perm, bands=args.bands)
+    t1 = time.perf_counter()
+    print(f"İndeks: {len(index)} tanım ({t1 - t0:.1f} s)")
+
+    rows = cross_sheet_duplicates(index, read_new_words(args.new), args.threshold, args.all)
+    rows.sort(key=lambda r: (r["reason"], -r["jaccard"], r["new_sheet"], str(r["kelime"])))
+    write_table(rows, REPORT_COLUMNS, args.out)
+    print(f"✔ {len(rows)} yakın tekrar ({time.perf_counter() - t1:.1f} s): {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,169 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import argparse, re, math
+import argparse
 from pathlib import Path
 from collections import defaultdict
 from openpyxl import load_workbook, Workbook
 
-# ---------- normalize ----------
-def normalize_tr(s):
-    if s is None:
-        return ""
-    s = str(s).strip()
-    # Şapkalı harfleri düz harflere indir
-    s = (s
-        .replace("Â", "A").replace("â", "a")
-        .replace("Î", "İ").replace("î", "i")
-        .replace("Û", "U").replace("û", "u")
-        .replace("I", "ı").replace("İ", "i")
-    )
-    s = re.sub(r"\s+", " ", s)
-    return s.casefold()
-
-# ---------- POS belirleyici ----------
-def guess_pos(defn: str) -> str:
-    """Tanım sonundaki son kelime -mak/-mek ise VERB, aksi halde NOUN."""
-    if not defn:
-        return "NOUN"
-    s = str(defn).strip().lower()
-    words = re.findall(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû]+", s)
-    if words:
-        last = words[-1]
-        if last.endswith("mak") or last.endswith("mek"):
-            return "VERB"
-    return "NOUN"
-
-# ---------- anlam tokenize ----------
-def tokenize_def(text):
-    """Tanımı kelime setine çevir (basit tokenizasyon)."""
-    if not text:
-        return set()
-    s = str(text).lower()
-    tokens = re.findall(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû0-9]+", s)
-    return set(tokens)
-
-# ---------- benzerlik metotları ----------
-def sim_overlap(new_tokens, old_tokens):
-    """|A∩B| / |A|  (A = yeni tanım)"""
-    if not new_tokens:
-        return 0.0
-    return len(new_tokens & old_tokens) / len(new_tokens)
-
-def sim_jaccard(tokens_a, tokens_b):
-    """|A∩B| / |A∪B|"""
-    if not tokens_a and not tokens_b:
-        return 0.0
-    inter = len(tokens_a & tokens_b)
-    union = len(tokens_a | tokens_b)
-    if union == 0:
-        return 0.0
-    return inter / union
-
-def sim_tfidf_cosine(tokens_a, tokens_b, df_counter, doc_count):
-    """
-    Basit TF-IDF + cosine:
-    - tf = 1 (sadece var/yok)
-    - idf = log((N+1)/(df+1)) + 1
-    """
-    if not tokens_a or not tokens_b or doc_count == 0:
-        return 0.0
-
-    vocab = tokens_a | tokens_b
-    num = 0.0
-    sum_a = 0.0
-    sum_b = 0.0
-
-    for t in vocab:
-        df = df_counter.get(t, 0)
-        idf = math.log((doc_count + 1) / (df + 1)) + 1.0
-        wa = idf if t in tokens_a else 0.0
-        wb = idf if t in tokens_b else 0.0
-        num += wa * wb
-        sum_a += wa * wa
-        sum_b += wb * wb
-
-    denom = (sum_a ** 0.5) * (sum_b ** 0.5)
-    if denom == 0.0:
-        return 0.0
-    return num / denom
-
-# ---------- header bulucu ----------
-def find_col(ws, wanted, search_rows=10):
-    """
-    ws içinde istenen başlık adlarını bulup 1-bazlı kolon indekslerini döndürür.
-    'DEFINITION' yerine 'ANLAM' da gelebilir, bu yüzden eş adları destekliyoruz.
-    """
-    synonyms = {
-        "DEFINITION": {"DEFINITION", "ANLAM"},
-        "KELİME": {"KELİME", "KELIME", "WORD"},
-        "POS": {"POS"},
-        "R": {"R"},
-        "ID": {"ID"},
-        "EXAMPLE SENTENCE": {"EXAMPLE SENTENCE", "EXAMPLE", "ÖRNEK"},
-    }
-
-    wanted_sets = {w: {w.lower()} | {x.lower() for x in synonyms.get(w, {w})} for w in wanted}
-    found = {w: None for w in wanted}
-
-    for row in ws.iter_rows(min_row=1, max_row=search_rows, values_only=True):
-        if not row:
-            continue
-        for j, val in enumerate(row, start=1):
-            if val is None:
-                continue
-            key = str(val).strip().lower()
-            for w in wanted:
-                if found[w] is None and key in wanted_sets[w]:
-                    found[w] = j
-        if all(found.get(w) for w in wanted if w != "EXAMPLE SENTENCE"):
-            break
-    return found
-
-# ---------- yeni sözlük kelimelerini oku ----------
-def read_new_words(new_path):
-    wb = load_workbook(new_path, read_only=True, data_only=True)
-    skip = {"özet", "toplam"}
-    data = {}
-    for sh in wb.sheetnames:
-        if sh.lower() in skip:
-            continue
-        ws = wb[sh]
-        idx = find_col(ws, ["kelime", "anlam"])
-        kcol, acol = idx.get("kelime"), idx.get("anlam")
-        if not kcol:
-            continue
-        pairs = []
-        for r in ws.iter_rows(min_row=2, values_only=True):
-            if not r:
-                continue
-            k = r[kcol - 1] if len(r) >= kcol else None
-            a = r[acol - 1] if acol and len(r) >= acol else ""
-            if k:
-                pairs.append((k, a))
-        data[sh] = pairs
-    return data
-
-# ---------- güvenli başlık oluşturucu ----------
-NEEDED_HEADERS = ["R", "KELİME", "ID", "POS", "DEFINITION", "EXAMPLE SENTENCE"]
-
-def ensure_headers(ws):
-    if ws.max_row < 1:
-        ws.append(NEEDED_HEADERS)
-    header_row = 1
-    header_vals = [ws.cell(header_row, c).value for c in range(1, ws.max_column + 1)]
-    if not any(header_vals):
-        for i, name in enumerate(NEEDED_HEADERS, start=1):
-            ws.cell(header_row, i, name)
-
-    idx = find_col(ws, NEEDED_HEADERS)
-    colmap = {}
-    for name in NEEDED_HEADERS:
-        c = idx.get(name)
-        if not c:
-            c = ws.max_column + 1
-            ws.cell(1, c, name)
-        colmap[name] = c
-    return colmap
+from sozluk import (
+    normalize_tr, guess_pos, tokenize_def, target_sheet,
+    sim_overlap, sim_jaccard, sim_tfidf_cosine,
+    find_col, read_new_words, ensure_headers,
+)
 
 # ---------- ana işlem ----------
 def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method="jaccard"):
@@ -230,11 +76,7 @@ def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method=
             if not norm:
                 continue
 
-            first = kelime.strip()[0] if kelime.strip() else ""
-            if   first in ("Â","â"): target = "A"
-            elif first in ("Î","î"): target = "İ"
-            elif first in ("Û","û"): target = "U"
-            else:                    target = sh
+            target = target_sheet(kelime, sh)
 
             ws, colmap, old_norm_map = ensure_page(target)
 
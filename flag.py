@@ -1,189 +1,503 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import argparse, re, math
+import sys
+import os
+import json
+import gzip
+import hashlib
+import argparse
+from array import array
+from collections import deque
 from pathlib import Path
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook, Workbook
 
-# ---------- normalize ----------
-def normalize_tr(s):
-    if s is None:
-        return ""
-    s = str(s).strip()
-    # Şapkalı harfleri düz harflere indir
-    s = (s
-        .replace("Â", "A").replace("â", "a")
-        .replace("Î", "İ").replace("î", "i")
-        .replace("Û", "U").replace("û", "u")
-        .replace("I", "ı").replace("İ", "i")
-    )
-    s = re.sub(r"\s+", " ", s)
-    return s.casefold()
-
-# ---------- POS belirleyici ----------
-def guess_pos(defn: str) -> str:
-    """Tanım sonundaki son kelime -mak/-mek ise VERB, aksi halde NOUN."""
-    if not defn:
-        return "NOUN"
-    s = str(defn).strip().lower()
-    words = re.findall(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû]+", s)
-    if words:
-        last = words[-1]
-        if last.endswith("mak") or last.endswith("mek"):
-            return "VERB"
-    return "NOUN"
-
-# ---------- anlam tokenize ----------
-def tokenize_def(text):
-    """Tanımı kelime setine çevir (basit tokenizasyon)."""
-    if not text:
-        return set()
-    s = str(text).lower()
-    tokens = re.findall(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû0-9]+", s)
-    return set(tokens)
-
-# ---------- benzerlik metotları ----------
-def sim_overlap(new_tokens, old_tokens):
-    """|A∩B| / |A|  (A = yeni tanım)"""
-    if not new_tokens:
-        return 0.0
-    return len(new_tokens & old_tokens) / len(new_tokens)
-
-def sim_jaccard(tokens_a, tokens_b):
-    """|A∩B| / |A∪B|"""
-    if not tokens_a and not tokens_b:
-        return 0.0
-    inter = len(tokens_a & tokens_b)
-    union = len(tokens_a | tokens_b)
-    if union == 0:
-        return 0.0
-    return inter / union
-
-def sim_tfidf_cosine(tokens_a, tokens_b, df_counter, doc_count):
+from sozluk import (
+    normalize_tr, guess_pos, tokenize_def, target_sheet,
+    SIM_METHODS, sim_overlap, sim_jaccard, TfidfIndex, corpus_stats,
+    find_col, read_new_words, ensure_headers, plan_headers, dictionary_columns, EntryStore,
+    file_sha256, write_table,
+)
+
+
+def candidate_scores(sim_method, new_tokens, candidates, tfidf=None):
+    """Yeni tanımın her adaya (entry["tokens"]) göre benzerlik skorları."""
+    if sim_method == "tfidf":
+        return tfidf.scores(new_tokens, candidates)
+    if sim_method == "jaccard":
+        return [sim_jaccard(new_tokens, c["tokens"]) for c in candidates]
+    return [sim_overlap(new_tokens, c["tokens"]) for c in candidates]
+
+
+# ---------- sayfa kararları ----------
+def decide_sheet(target, words, store, next_row, sim_method, sim_threshold, fuzzy=0, tfidf=None):
     """
-    Basit TF-IDF + cosine:
-    - tf = 1 (sadece var/yok)
-    - idf = log((N+1)/(df+1)) + 1
+    Tek hedef sayfanın eşleştirme kararları; çalışma kitabına dokunmaz.
+    words: [(sıra, kelime, anlam, norm), ...] yeni veri sırasıyla.
+    store: sayfanın eski kayıtları (EntryStore) — eşik altında eklenen satırlar
+    buraya da eklenir, aynı sayfadaki sonraki kelimelere aday olur.
+    next_row: sayfaya eklenecek ilk satırın numarası.
+    fuzzy > 0: başlığı birebir bulunamayan kelime için Türkçe ağırlıklı düzenleme uzaklığı en çok
+    bu kadar olan başlıklar aday olur (store.near); tek aday da olsa benzerlik eşiği aranır.
+    Döner: stats, edits (sırayla; ("R", satır) ya da ("add", satır, kelime, anlam)),
+    matches ve ambiguous ((sıra, kayıt) listeleri).
     """
-    if not tokens_a or not tokens_b or doc_count == 0:
-        return 0.0
-
-    vocab = tokens_a | tokens_b
-    num = 0.0
-    sum_a = 0.0
-    sum_b = 0.0
-
-    for t in vocab:
-        df = df_counter.get(t, 0)
-        idf = math.log((doc_count + 1) / (df + 1)) + 1.0
-        wa = idf if t in tokens_a else 0.0
-        wb = idf if t in tokens_b else 0.0
-        num += wa * wb
-        sum_a += wa * wa
-        sum_b += wb * wb
-
-    denom = (sum_a ** 0.5) * (sum_b ** 0.5)
-    if denom == 0.0:
-        return 0.0
-    return num / denom
-
-# ---------- header bulucu ----------
-def find_col(ws, wanted, search_rows=10):
+    st = {"total": 0, "matched": 0, "added": 0}
+    edits, matches, ambiguous = [], [], []
+
+    def add_row(kelime, anlam, norm):
+        nonlocal next_row
+        st["added"] += 1
+        edits.append(("add", next_row, kelime, anlam))
+        store.add(norm, next_row, anlam, tokenize_def(anlam))
+        next_row += 1
+
+    for seq, kelime, anlam, norm in words:
+        st["total"] += 1
+        candidates = store.get(norm)
+        near = False
+        if not candidates and fuzzy:
+            # OCR hatalı başlık ("bigi" / "bilgi"): yakın başlıkların satırları tanımla sıralanır
+            candidates = store.near(norm, fuzzy)
+            near = bool(candidates)
+        if not candidates:
+            add_row(kelime, anlam, norm)
+            continue
+
+        # tek satır varsa direkt match (score=1)
+        if len(candidates) == 1 and not near:
+            row_idx = store.rows[candidates[0]]
+            edits.append(("R", row_idx))
+            st["matched"] += 1
+            matches.append((seq, {
+                "sheet": target,
+                "word": kelime,
+                "mode": "single",
+                "row": row_idx,
+                "score": 1.0,
+                "new_def": anlam,
+                "old_def": store.defs[candidates[0]],
+                "candidate_count": 1,
+            }))
+            continue
+
+        new_tokens = tokenize_def(anlam)
+        best_row = None
+        best_score = 0.0
+        best_old_def = None
+        cand_scores = []  # her candidate için (kayıt, score)
+
+        if new_tokens:
+            scores = store.scores(sim_method, new_tokens, candidates, tfidf)
+            for cand, score in zip(candidates, scores):
+                cand_scores.append((cand, score))
+
+                if score > best_score:
+                    best_score = score
+                    best_row = store.rows[cand]
+                    best_old_def = store.defs[cand]
+
+        if best_row is None or best_score < sim_threshold:
+            # threshold altında → match kabul etmiyoruz, yeni satır ekle
+            add_row(kelime, anlam, norm)
+            continue
+
+        # En iyi satıra R=1 yaz
+        edits.append(("R", best_row))
+        st["matched"] += 1
+
+        # Konsol logu için sadece seçileni threshold_matches'e yaz
+        matches.append((seq, {
+            "sheet": target,
+            "word": kelime,
+            "mode": f"{'fuzzy' if near else 'duplicate'}+{sim_method}",
+            "row": best_row,
+            "score": best_score,
+            "new_def": anlam,
+            "old_def": best_old_def,
+            "candidate_count": len(candidates),
+        }))
+
+        # Ambiguous Excel için: tüm adaylar + kendi skorları + chosen flag
+        for cand, score in (cand_scores if len(candidates) > 1 else ()):
+            ambiguous.append((seq, {
+                "sheet": target,
+                "word": kelime,
+                "row": store.rows[cand],     # HukukSözlüğü satırı
+                "score": score,
+                "chosen": (store.rows[cand] == best_row),
+                "candidate_count": len(candidates),
+                "new_def": anlam,
+                "old_def": store.defs[cand],
+                "method": sim_method,
+            }))
+
+    return {"stats": st, "edits": edits, "matches": matches, "ambiguous": ambiguous}
+
+
+def _row_hash(kelime, anlam):
+    """Yeni veri satırının içerik özeti (manifest'te satır başına tutulur)."""
+    return hashlib.blake2b(repr((kelime, anlam)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def decide_incremental(target, words, store, next_row, sim_method, sim_threshold, fuzzy=0,
+                       tfidf=None, previous=None):
     """
-    ws içinde istenen başlık adlarını bulup 1-bazlı kolon indekslerini döndürür.
-    'DEFINITION' yerine 'ANLAM' da gelebilir, bu yüzden eş adları destekliyoruz.
+    decide_sheet'in artımlı hâli; aynı sonucu döndürür, ek olarak "groups" (manifest'e
+    yazılacak grup özetleri ve kararları) ve "rescored" (yeniden skorlanan kelime sayısı).
+    Bir kelimenin adayları sadece aynı başlıklı (norm) eski satırlar ve sayfada kendinden
+    önce eklenen aynı başlıklı kelimelerdir; bu yüzden kararlar başlık grubu başına saklanır
+    ve satırları (sırasıyla) değişmeyen grup yeniden skorlanmaz. Değişen grubun tüm
+    kelimeleri (eklenen, değişen ve aday kümesi değişen sonrakiler) skorlanır.
+    fuzzy > 0'da yakın başlıklar da aday olduğundan sayfanın tamamı tek gruptur.
+    previous: önceki çalıştırmanın bu sayfa için "groups"u (None = hepsi yeni).
+    Kararlarda eski satırlar numarasıyla, grubun eklediği satırlar -1, -2, ... diye tutulur;
+    eklenen satır numaraları her çalıştırmada sayfa sırasıyla yeniden verilir.
     """
-    synonyms = {
-        "DEFINITION": {"DEFINITION", "ANLAM"},
-        "KELİME": {"KELİME", "KELIME", "WORD"},
-        "POS": {"POS"},
-        "R": {"R"},
-        "ID": {"ID"},
-        "EXAMPLE SENTENCE": {"EXAMPLE SENTENCE", "EXAMPLE", "ÖRNEK"},
-    }
-
-    wanted_sets = {w: {w.lower()} | {x.lower() for x in synonyms.get(w, {w})} for w in wanted}
-    found = {w: None for w in wanted}
-
-    for row in ws.iter_rows(min_row=1, max_row=search_rows, values_only=True):
-        if not row:
-            continue
-        for j, val in enumerate(row, start=1):
-            if val is None:
+    previous = previous or {}
+    members, hashes = {}, {}
+    for i, (_, kelime, anlam, norm) in enumerate(words):
+        g = "" if fuzzy else norm
+        members.setdefault(g, []).append(i)
+        hashes.setdefault(g, []).append(_row_hash(kelime, anlam))
+
+    decisions = {}
+    for g, rows in hashes.items():
+        old = previous.get(g)
+        if old is not None and old["rows"] == rows:
+            decisions[g] = old["decisions"]
+    todo = sorted(i for g in members if g not in decisions for i in members[g])
+    n_old = len(store)
+
+    if todo:
+        res = decide_sheet(target, [words[i] for i in todo], store, next_row, sim_method,
+                           sim_threshold, fuzzy, tfidf)
+        match_of = dict(res["matches"])
+        amb_of = {}
+        for seq, rec in res["ambiguous"]:
+            amb_of.setdefault(seq, []).append(rec)
+        ref_of = {}     # bu çalıştırmada eklenen satır -> grup içi referans (-1, -2, ...)
+
+        def ref(row):
+            return row if row < next_row else ref_of[row]
+
+        for i, edit in zip(todo, res["edits"]):
+            seq, _, _, norm = words[i]
+            g = "" if fuzzy else norm
+            out = decisions.setdefault(g, [])
+            if edit[0] == "add":
+                ref_of[edit[1]] = -1 - sum(d is None for d in out)
+                out.append(None)
                 continue
-            key = str(val).strip().lower()
-            for w in wanted:
-                if found[w] is None and key in wanted_sets[w]:
-                    found[w] = j
-        if all(found.get(w) for w in wanted if w != "EXAMPLE SENTENCE"):
-            break
-    return found
-
-# ---------- yeni sözlük kelimelerini oku ----------
-def read_new_words(new_path):
-    wb = load_workbook(new_path, read_only=True, data_only=True)
-    skip = {"özet", "toplam"}
-    data = {}
-    for sh in wb.sheetnames:
-        if sh.lower() in skip:
+            m = match_of[seq]
+            out.append([ref(edit[1]), m["mode"], m["score"], m["candidate_count"],
+                        [[ref(a["row"]), a["score"]] for a in amb_of.get(seq, ())]])
+
+    # kararlar sayfa sırasıyla açılır; eklenen satırlar tam çalıştırmadaki numaralarını alır
+    st = {"total": 0, "matched": 0, "added": 0}
+    edits, matches, ambiguous = [], [], []
+    old_defs = {store.rows[k]: store.defs[k] for k in range(n_old)}
+    pos = dict.fromkeys(members, 0)
+    added = {g: [] for g in members}
+
+    def resolve(g, r):
+        return added[g][-1 - r] if r < 0 else (r, old_defs[r])
+
+    for seq, kelime, anlam, norm in words:
+        g = "" if fuzzy else norm
+        d = decisions[g][pos[g]]
+        pos[g] += 1
+        st["total"] += 1
+        if d is None:
+            st["added"] += 1
+            edits.append(("add", next_row, kelime, anlam))
+            added[g].append((next_row, anlam))
+            next_row += 1
             continue
-        ws = wb[sh]
-        idx = find_col(ws, ["kelime", "anlam"])
-        kcol, acol = idx.get("kelime"), idx.get("anlam")
-        if not kcol:
+        r, mode, score, count, amb = d
+        row, old_def = resolve(g, r)
+        edits.append(("R", row))
+        st["matched"] += 1
+        matches.append((seq, {"sheet": target, "word": kelime, "mode": mode, "row": row,
+                              "score": score, "new_def": anlam, "old_def": old_def,
+                              "candidate_count": count}))
+        for a, a_score in amb:
+            a_row, a_def = resolve(g, a)
+            ambiguous.append((seq, {"sheet": target, "word": kelime, "row": a_row,
+                                    "score": a_score, "chosen": a_row == row,
+                                    "candidate_count": count, "new_def": anlam,
+                                    "old_def": a_def, "method": sim_method}))
+
+    groups = {g: {"rows": hashes[g], "decisions": decisions[g]} for g in members}
+    return {"stats": st, "edits": edits, "matches": matches, "ambiguous": ambiguous,
+            "groups": groups, "rescored": len(todo)}
+
+
+_WORKER_TFIDF = None
+
+
+def _init_flag_worker(tfidf):
+    global _WORKER_TFIDF
+    _WORKER_TFIDF = tfidf
+
+
+def _decide_task(args, tfidf=None):
+    """args: decide_sheet argümanları + previous (None = artımlı değil)."""
+    *args, previous = args
+    tfidf = _WORKER_TFIDF if tfidf is None else tfidf
+    if previous is None:
+        return decide_sheet(*args, tfidf=tfidf)
+    return decide_incremental(*args, tfidf=tfidf, previous=previous)
+
+
+def index_old_rows(rows, kcol, dcol, start=2):
+    """
+    Eski sözlük satırlarından (values_only, start. satırdan itibaren) eşleştirme
+    deposunu (EntryStore: norm → satır, tanım, token kimlikleri) kurar.
+    """
+    store = EntryStore()
+    for row_idx, row in enumerate(rows, start=start):
+        cell_val = row[kcol - 1] if kcol <= len(row) else None
+        if not cell_val:
             continue
-        pairs = []
-        for r in ws.iter_rows(min_row=2, values_only=True):
-            if not r:
+        norm = normalize_tr(cell_val)
+        def_val = row[dcol - 1] if dcol <= len(row) else ""
+        store.add(norm, row_idx, def_val, tokenize_def(def_val))
+    return store
+
+
+def default_r(ws, rows, rcol, start=2):
+    """
+    rows'u (values_only, start. satırdan) aynen geçirirken boş R hücrelerini 0 yapar;
+    R varsayılanı indeks kurulan geçişte verilir, sonradan ayrı bir tarama gerekmez.
+    """
+    for row_idx, row in enumerate(rows, start=start):
+        val = row[rcol - 1] if rcol <= len(row) else None
+        if val is None or str(val).strip() == "":
+            ws.cell(row_idx, rcol, 0)
+        yield row
+
+
+def _write_rows(ws_out, rows, rcol, last=0, writes=None, edits=(), colmap=None):
+    """
+    Bir sayfanın satırlarını (values_only) değişiklikleri uygulayarak xlsxwriter sayfasına yazar:
+    başlık düzeltmeleri (writes), edits (("R", satır) / ("add", satır, kelime, anlam)) ve
+    boş R hücrelerine 0 (normal moddaki son geçişle aynı). last: eklemelerden önceki son
+    satır (kaynakta olmayan boş satırlar da R=0 alır).
+    """
+    marks, adds = set(), {}
+    for edit in edits:
+        if edit[0] == "R":
+            marks.add(edit[1])
+        else:
+            adds[edit[1]] = edit[2:]
+
+    def put(r, vals):
+        if r == 1:
+            for c, head in (writes or {}).items():
+                vals += [None] * (c - len(vals))
+                vals[c - 1] = head
+        elif rcol:
+            vals += [None] * (rcol - len(vals))
+            if r in marks:
+                vals[rcol - 1] = 1
+            elif vals[rcol - 1] is None or str(vals[rcol - 1]).strip() == "":
+                vals[rcol - 1] = 0
+        for c, v in enumerate(vals):
+            if v is not None:
+                ws_out.write(r - 1, c, v)
+
+    r = 0
+    for r, src in enumerate(rows, start=1):
+        put(r, list(src))
+    for r in range(r + 1, last + 1):
+        put(r, [])
+    for r in sorted(adds):
+        kelime, anlam = adds[r]
+        vals = [None] * max(colmap.values())
+        vals[colmap["KELİME"] - 1] = kelime
+        vals[colmap["DEFINITION"] - 1] = anlam
+        vals[colmap["POS"] - 1] = guess_pos(anlam)
+        vals[rcol - 1] = 1 if r in marks else 0
+        for c, v in enumerate(vals):
+            if v is not None:
+                ws_out.write(r - 1, c, v)
+
+
+def flag_stream(wb_src, parts, out_path, sim_method, sim_threshold, tfidf=None, workers=1,
+                fuzzy=0, previous=None):
+    """
+    update_and_flag'in akışlı modu: salt okunur wb_src sayfa sayfa okunur; işlenecek sayfa
+    (parts'ta olan) belleğe alınıp indekslenir, kararı verilir ve değişiklik listesiyle
+    doğrudan out_path'e yazılır (xlsxwriter, constant_memory). Bellekte aynı anda en çok
+    workers kadar sayfa durur. parts: { hedef: [(sıra, kelime, anlam, norm), ...] }.
+    previous ({ hedef: grup kararları }) verilirse kararlar decide_incremental'la verilir.
+    Döner: { hedef: decide_sheet sonucu }.
+    """
+    import xlsxwriter
+
+    names = list(wb_src.sheetnames)
+    names += [t for t in parts if t not in names]
+    out = xlsxwriter.Workbook(str(out_path), {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    ws_out = {name: out.add_worksheet(name) for name in names}
+
+    results = {}
+    pending = deque()   # (hedef, satırlar, sayfa planı, future)
+
+    def flush(name, rows, page, res):
+        results[name] = res
+        _write_rows(ws_out[name], rows, page["colmap"]["R"], page["last"],
+                    page["writes"], res["edits"], page["colmap"])
+
+    ex = None
+    if workers > 1 and len(parts) > 1:
+        ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_flag_worker,
+                                 initargs=(tfidf,))
+    try:
+        for name in names:
+            ws = wb_src[name] if name in wb_src.sheetnames else None
+            if name not in parts:
+                # dokunulmayan sayfa: olduğu gibi akıt, sadece boş R → 0
+                rcol = find_col(ws, ["R"]).get("R")
+                _write_rows(ws_out[name], ws.iter_rows(values_only=True), rcol)
+                continue
+
+            # başlık düzeltmeleri ve satır numaraları ensure_headers'la aynı
+            # (boyutu yazılmamış sayfalarda satır uzunlukları farklı olabilir)
+            rows = list(ws.iter_rows(values_only=True)) if ws is not None else []
+            width = max(map(len, rows), default=1)
+            colmap, writes, scanned = plan_headers(rows[:10], width)
+            last = max(len(rows), scanned, 1)
+            page = {"colmap": colmap, "writes": writes, "last": last}
+            store = index_old_rows(rows[1:], colmap["KELİME"], colmap["DEFINITION"])
+            task = (name, parts[name], store, last + 1, sim_method, sim_threshold, fuzzy,
+                    None if previous is None else previous.get(name, {}))
+
+            if ex is None:
+                flush(name, rows, page, _decide_task(task, tfidf))
                 continue
-            k = r[kcol - 1] if len(r) >= kcol else None
-            a = r[acol - 1] if acol and len(r) >= acol else ""
-            if k:
-                pairs.append((k, a))
-        data[sh] = pairs
-    return data
-
-# ---------- güvenli başlık oluşturucu ----------
-NEEDED_HEADERS = ["R", "KELİME", "ID", "POS", "DEFINITION", "EXAMPLE SENTENCE"]
-
-def ensure_headers(ws):
-    if ws.max_row < 1:
-        ws.append(NEEDED_HEADERS)
-    header_row = 1
-    header_vals = [ws.cell(header_row, c).value for c in range(1, ws.max_column + 1)]
-    if not any(header_vals):
-        for i, name in enumerate(NEEDED_HEADERS, start=1):
-            ws.cell(header_row, i, name)
-
-    idx = find_col(ws, NEEDED_HEADERS)
-    colmap = {}
-    for name in NEEDED_HEADERS:
-        c = idx.get(name)
-        if not c:
-            c = ws.max_column + 1
-            ws.cell(1, c, name)
-        colmap[name] = c
-    return colmap
+            pending.append((name, rows, page, ex.submit(_decide_task, task)))
+            if len(pending) >= workers:
+                name_, rows_, page_, fut = pending.popleft()
+                flush(name_, rows_, page_, fut.result())
+        while pending:
+            name_, rows_, page_, fut = pending.popleft()
+            flush(name_, rows_, page_, fut.result())
+    finally:
+        if ex is not None:
+            ex.shutdown()
+    out.close()
+    return results
+
+
+# ---------- artımlı çalışma ----------
+MANIFEST_VERSION = 1
+
+
+def load_manifest(path):
+    """Artımlı çalışma manifest'i (gzip'li JSON); dosya yoksa ya da sürüm tutmazsa None."""
+    if not path or not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if data.get("version") == MANIFEST_VERSION else None
+
+
+def save_manifest(path, data):
+    """Manifest'i gzip'li JSON olarak atomik yazar."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, **data}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _output_current(manifest, new_digest, out_path, sheets, stream):
+    """Yeni sözlük, sayfa seçimi ve mod aynı, çıktı(lar) da son yazıldığı gibi mi?"""
+    if new_digest is None or manifest["new"] != new_digest:
+        return False
+    if manifest["sheets"] != (sorted(sheets) if sheets is not None else None):
+        return False
+    if manifest["stream"] != stream or not os.path.exists(out_path):
+        return False
+    if manifest["ambiguous"] and not _ambiguous_path(out_path).exists():
+        return False
+    return file_sha256(out_path) == manifest["out"]
+
+
+def _ambiguous_path(out_path):
+    p = Path(out_path)
+    return p.with_name(p.stem + "_ambiguous.xlsx")
+
 
 # ---------- ana işlem ----------
-def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method="jaccard"):
-    wb_old = load_workbook(old_path, read_only=False, data_only=True)
-    new_data = read_new_words(new_path)
+def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method="jaccard",
+                    new_data=None, stats_path=None, sheets=None, verbose=True, workers=1,
+                    stream=False, fuzzy=0, manifest_path=None):
+    """
+    Eski sözlüğü (old_path) yeni sözlükteki kelimelerle işaretler ve out_path'e yazar;
+    sayfa bazlı { "total", "matched", "added" } sayılarını döndürür.
+    new_data ({ sayfa: [(kelime, anlam), ...] }) verilirse new_path okunmaz;
+    pipeline bu sayede ara xlsx yazmadan çağırabilir.
+    stats_path: tf-idf korpus istatistikleri dosyası (.json.gz); aynı old_path için
+    varsa okunur, yoksa yazılır.
+    sheets: sadece bu hedef sayfalara düşen kelimeleri işle (None = hepsi).
+    verbose=False: konsola hiçbir şey yazma (toplu işler için).
+    workers > 1: hedef sayfalar birbirinden bağımsız olduğundan her sayfanın kararları
+    ayrı süreçte verilir; düzenlemeler ve kayıtlar yeni veri sırasıyla birleştirilir,
+    sonuç seri çalışmayla aynıdır.
+    stream=True: eski sözlük salt okunur açılır ve sayfa sayfa işlenip yazılır (flag_stream);
+    tüm çalışma kitabı belleğe alınmaz, kaydetme de akışlıdır. Hücre değerleri normal modla
+    aynıdır, biçimler (stil, kolon genişliği vb.) taşınmaz; xlsxwriter gerekir.
+    fuzzy=k (> 0): başlığı sayfada birebir bulunmayan kelimeler için düzenleme uzaklığı en çok
+    k olan başlıklar da aday olur (OCR hataları; ı/i, ş/s, ğ/g, ç/c, ö/o, ü/u ve şapkalı
+    ünlü karışıklıkları trie.TR_SUB_COST, diğer harf farkları 1 sayılır); eşleşme yine
+    benzerlik eşiğine bağlıdır, kayıtlarda mode="fuzzy+<metot>" görünür.
+    manifest_path: artımlı çalışma (.json.gz). Yeni veri satırlarının özetleri ve kararlar
+    başlık grubu başına saklanır (decide_incremental); eski sözlük (sha256), metot, eşik ve
+    fuzzy aynıysa sadece satırları değişen grupların kelimeleri yeniden skorlanır, çıktı
+    önceki kararlarla birlikte yeniden yazılır. Girdiler hiç değişmemiş ve çıktı son
+    yazıldığı gibiyse hiçbir şey okunmadan önceki sayılar döner. Sonuç tam çalışmayla aynıdır.
+    """
+    log = print if verbose else (lambda *a, **k: None)
+    previous = None
+    if manifest_path:
+        key = {"old": file_sha256(old_path), "method": sim_method,
+               "threshold": sim_threshold, "fuzzy": fuzzy}
+        new_digest = file_sha256(new_path) if new_data is None else None
+        manifest = load_manifest(manifest_path)
+        if manifest is not None and manifest["key"] != key:
+            manifest = None
+        if manifest is not None and _output_current(manifest, new_digest, out_path, sheets, stream):
+            log(f"Girdiler ve ayarlar son çalıştırmayla aynı, çıktı güncel: {out_path}")
+            return manifest["stats"]
+        previous = manifest["groups"] if manifest is not None else {}
+    wb_old = load_workbook(old_path, read_only=stream, data_only=True)
+    if new_data is None:
+        new_data = read_new_words(new_path)
 
     stats = {}              # { sheet_name: {"total":0, "matched":0, "added":0} }
     threshold_matches = []  # sadece seçilen match'ler (log için)
     ambiguous_rows = []     # candidate_count>1 ve match olan tüm adaylar (hocanın sözlüğü tarafı)
 
-    # tf-idf için global df ve doküman sayısı
-    df_counter = defaultdict(int)
-    doc_count = 0
+    # tf-idf için df ve doküman sayısı: eski sözlüğün tüm sayfalarından, işleme
+    # başlamadan önce bir kez (sayfa sırasından bağımsız)
+    tfidf = None
+    if sim_method == "tfidf":
+        corpus = corpus_stats(old_path, wb=wb_old, cache_path=stats_path)
+        tfidf = TfidfIndex.from_stats(corpus)
+        log(f"Korpus: {corpus.doc_count} tanım, {len(corpus)} farklı token")
 
-    # cache: sheet_name -> (ws, colmap, old_norm_map)
-    # old_norm_map: { norm : [ {"row":int, "def":str, "tokens":set}, ... ] }
+    # cache: sheet_name -> (ws, colmap, store, next_row)
+    # store: sayfanın eski kayıtları (EntryStore; norm → satır, tanım, token kimlikleri)
     cache = {}
 
     def ensure_page(letter):
-        nonlocal doc_count
         if letter in cache:
             return cache[letter]
 
@@ -193,186 +507,107 @@ def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method=
             ws = wb_old[letter]
 
         colmap = ensure_headers(ws)
-        kcol = colmap["KELİME"]
-        dcol = colmap["DEFINITION"]
-
-        old_norm_map = {}
+        rows = ws.iter_rows(min_row=2, values_only=True)
+        store = index_old_rows(default_r(ws, rows, colmap["R"]),
+                               colmap["KELİME"], colmap["DEFINITION"])
 
-        for row in ws.iter_rows(min_row=2, values_only=False):
-            cell_val = row[kcol - 1].value
-            if not cell_val:
-                continue
-            norm = normalize_tr(cell_val)
-            def_val = row[dcol - 1].value if dcol <= len(row) else ""
-            tokens = tokenize_def(def_val)
-
-            if tokens:
-                doc_count += 1
-                for tok in tokens:
-                    df_counter[tok] += 1
-
-            entry = {
-                "row": row[0].row,
-                "def": def_val,
-                "tokens": tokens,
-            }
-            old_norm_map.setdefault(norm, []).append(entry)
-
-        cache[letter] = (ws, colmap, old_norm_map)
+        cache[letter] = (ws, colmap, store, ws.max_row + 1)
         return cache[letter]
 
-    print(f"Kullanılan benzerlik threshold'u: {sim_threshold}")
-    print(f"Kullanılan benzerlik metodu: {sim_method}\n")
+    log(f"Kullanılan benzerlik threshold'u: {sim_threshold}")
+    log(f"Kullanılan benzerlik metodu: {sim_method}\n")
 
-    # yeni veriyi tara
+    # yeni veriyi hedef sayfalara böl (Â/Î/Û yönlendirmesi kelimeden belli);
+    # sıra numarası kayıtları sonunda yeni veri sırasıyla birleştirmek için
+    parts = {}
+    seq = 0
     for sh, pairs in new_data.items():
         for (kelime, anlam) in pairs:
             norm = normalize_tr(kelime)
             if not norm:
                 continue
 
-            first = kelime.strip()[0] if kelime.strip() else ""
-            if   first in ("Â","â"): target = "A"
-            elif first in ("Î","î"): target = "İ"
-            elif first in ("Û","û"): target = "U"
-            else:                    target = sh
-
-            ws, colmap, old_norm_map = ensure_page(target)
+            target = target_sheet(kelime, sh)
+            if sheets is not None and target not in sheets:
+                continue
+            parts.setdefault(target, []).append((seq, kelime, anlam, norm))
+            seq += 1
 
-            if target not in stats:
-                stats[target] = {"total": 0, "matched": 0, "added": 0}
+    if stream:
+        done = flag_stream(wb_old, parts, out_path, sim_method, sim_threshold, tfidf, workers,
+                           fuzzy, previous)
+        results = [done[target] for target in parts]
+    else:
+        # sayfalar ilk kelimelerinin sırasıyla açılır/oluşturulur
+        tasks = []
+        for target, words in parts.items():
+            ws, colmap, store, next_row = ensure_page(target)
+            tasks.append((target, words, store, next_row, sim_method, sim_threshold, fuzzy,
+                          None if previous is None else previous.get(target, {})))
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_flag_worker,
+                                     initargs=(tfidf,)) as ex:
+                results = list(ex.map(_decide_task, tasks))
+        else:
+            results = [_decide_task(t, tfidf) for t in tasks]
 
-            stats[target]["total"] += 1
+        for target, res in zip(parts, results):
+            ws, colmap, _, _ = cache[target]
             kcol = colmap["KELİME"]
             dcol = colmap["DEFINITION"]
             pcol = colmap["POS"]
             rcol = colmap["R"]
-
-            if norm in old_norm_map:
-                candidates = old_norm_map[norm]
-
-                # tek satır varsa direkt match (score=1)
-                if len(candidates) == 1:
-                    row_idx = candidates[0]["row"]
-                    ws.cell(row=row_idx, column=rcol, value=1)
-                    stats[target]["matched"] += 1
-                    threshold_matches.append({
-                        "sheet": target,
-                        "word": kelime,
-                        "mode": "single",
-                        "row": row_idx,
-                        "score": 1.0,
-                        "new_def": anlam,
-                        "old_def": candidates[0]["def"],
-                        "candidate_count": 1,
-                    })
+            for edit in res["edits"]:
+                if edit[0] == "R":
+                    ws.cell(row=edit[1], column=rcol, value=1)
                 else:
-                    new_tokens = tokenize_def(anlam)
-                    best_row = None
-                    best_score = 0.0
-                    best_old_def = None
-                    cand_scores = []  # her candidate için (entry, score)
-
-                    if new_tokens:
-                        for cand in candidates:
-                            old_tokens = cand["tokens"]
-
-                            if sim_method == "tfidf":
-                                score = sim_tfidf_cosine(new_tokens, old_tokens, df_counter, doc_count)
-                            elif sim_method == "jaccard":
-                                score = sim_jaccard(new_tokens, old_tokens)
-                            else:
-                                score = sim_overlap(new_tokens, old_tokens)
-
-                            cand_scores.append((cand, score))
-
-                            if score > best_score:
-                                best_score = score
-                                best_row = cand["row"]
-                                best_old_def = cand["def"]
-
-                    if best_row is not None and best_score >= sim_threshold:
-                        # En iyi satıra R=1 yaz
-                        ws.cell(row=best_row, column=rcol, value=1)
-                        stats[target]["matched"] += 1
-
-                        # Konsol logu için sadece seçileni threshold_matches'e yaz
-                        threshold_matches.append({
-                            "sheet": target,
-                            "word": kelime,
-                            "mode": f"duplicate+{sim_method}",
-                            "row": best_row,
-                            "score": best_score,
-                            "new_def": anlam,
-                            "old_def": best_old_def,
-                            "candidate_count": len(candidates),
-                        })
-
-                        # Ambiguous Excel için: tüm adaylar + kendi skorları + chosen flag
-                        for cand, score in cand_scores:
-                            ambiguous_rows.append({
-                                "sheet": target,
-                                "word": kelime,
-                                "row": cand["row"],          # HukukSözlüğü satırı
-                                "score": score,
-                                "chosen": (cand["row"] == best_row),
-                                "candidate_count": len(candidates),
-                                "new_def": anlam,
-                                "old_def": cand["def"],
-                                "method": sim_method,
-                            })
-                    else:
-                        # threshold altında → match kabul etmiyoruz, yeni satır ekle
-                        stats[target]["added"] += 1
-                        new_row_idx = ws.max_row + 1
-                        ws.cell(new_row_idx, kcol, kelime)
-                        ws.cell(new_row_idx, dcol, anlam)
-                        ws.cell(new_row_idx, pcol, guess_pos(anlam))
-                        ws.cell(new_row_idx, rcol, 0)
-                        old_norm_map.setdefault(norm, []).append({
-                            "row": new_row_idx,
-                            "def": anlam,
-                            "tokens": tokenize_def(anlam),
-                        })
-            else:
-                stats[target]["added"] += 1
-                new_row_idx = ws.max_row + 1
-                ws.cell(new_row_idx, kcol, kelime)
-                ws.cell(new_row_idx, dcol, anlam)
-                ws.cell(new_row_idx, pcol, guess_pos(anlam))
-                ws.cell(new_row_idx, rcol, 0)
-                old_norm_map.setdefault(norm, []).append({
-                    "row": new_row_idx,
-                    "def": anlam,
-                    "tokens": tokenize_def(anlam),
-                })
-
-    # --- R boşsa 0 yap ---
-    for sh in wb_old.sheetnames:
-        ws = wb_old[sh]
-        idx = find_col(ws, ["R"])
-        rcol = idx.get("R")
-        if not rcol:
-            continue
-        for row in ws.iter_rows(min_row=2):
-            cell = row[rcol - 1]
-            if cell.value is None or str(cell.value).strip() == "":
-                cell.value = 0
+                    _, new_row_idx, kelime, anlam = edit
+                    ws.cell(new_row_idx, kcol, kelime)
+                    ws.cell(new_row_idx, dcol, anlam)
+                    ws.cell(new_row_idx, pcol, guess_pos(anlam))
+                    ws.cell(new_row_idx, rcol, 0)
+
+        # --- R boşsa 0 yap --- (işlenen sayfalarda ensure_page'de yapıldı; diğerlerinde
+        # sadece R kolonu gezilir)
+        for sh in wb_old.sheetnames:
+            if sh in cache:
+                continue
+            ws = wb_old[sh]
+            idx = find_col(ws, ["R"])
+            rcol = idx.get("R")
+            if not rcol:
+                continue
+            for (cell,) in ws.iter_rows(min_row=2, min_col=rcol, max_col=rcol):
+                if cell.value is None or str(cell.value).strip() == "":
+                    cell.value = 0
+
+        wb_old.save(out_path)
 
-    wb_old.save(out_path)
+    matches, ambiguous = [], []
+    for target, res in zip(parts, results):
+        stats[target] = res["stats"]
+        matches.extend(res["matches"])
+        ambiguous.extend(res["ambiguous"])
+
+    # kayıtlar yeni veri sırasıyla (sıralama kararlı: aynı kelimenin adayları kendi sırasında kalır)
+    matches.sort(key=lambda x: x[0])
+    ambiguous.sort(key=lambda x: x[0])
+    threshold_matches = [m for _, m in matches]
+    ambiguous_rows = [m for _, m in ambiguous]
 
     # ----- threshold ile eşleşenlerin konsol çıktısı -----
-    print("\n==== THRESHOLD İLE EŞLEŞEN SATIRLAR ====")
+    log("\n==== THRESHOLD İLE EŞLEŞEN SATIRLAR ====")
     if not threshold_matches:
-        print("Bu threshold ile hiç eşleşme yapılmadı.")
+        log("Bu threshold ile hiç eşleşme yapılmadı.")
     else:
         for m in threshold_matches:
-            print(
+            log(
                 f"[{m['sheet']}] kelime='{m['word']}' "
                 f"(mode={m['mode']}, satır={m['row']}, skor={m['score']:.3f}, "
                 f"aday_sayısı={m['candidate_count']})"
             )
-        print(f"Toplam threshold-match sayısı: {len(threshold_matches)}")
+        log(f"Toplam threshold-match sayısı: {len(threshold_matches)}")
 
     # ----- çok adaylı match'ler için ayrı Excel (hocanın sözlüğü tarafı, her aday satır + score) -----
     # ambiguous_rows zaten sadece: len(candidates)>1 VE best_score>=threshold durumunda doluyor.
@@ -405,75 +640,332 @@ def update_and_flag(old_path, new_path, out_path, sim_threshold=0.5, sim_method=
                 m["method"],
             ])
 
-        amb_path = Path(out_path)
-        amb_file = amb_path.with_name(amb_path.stem + "_ambiguous.xlsx")
+        amb_file = _ambiguous_path(out_path)
         amb_wb.save(amb_file)
-        print(f"\n✔ {len(ambiguous_rows)} aday satır (candidate>1 & matched) ayrı dosyaya yazıldı: {amb_file}")
+        log(f"\n✔ {len(ambiguous_rows)} aday satır (candidate>1 & matched) ayrı dosyaya yazıldı: {amb_file}")
     else:
-        print("\nÇok adaylı ve match edilmiş eşleşme bulunmadı, ek Excel üretilmedi.")
+        log("\nÇok adaylı ve match edilmiş eşleşme bulunmadı, ek Excel üretilmedi.")
 
     # ----- sayfa bazlı özet -----
-    print("\n==== SAYFA BAZLI ÖZET ====")
+    log("\n==== SAYFA BAZLI ÖZET ====")
     total_all = sum(d["total"] for d in stats.values())
     matched_all = sum(d["matched"] for d in stats.values())
     added_all = sum(d["added"] for d in stats.values())
 
     for letter in sorted(stats.keys()):
         d = stats[letter]
-        print(f"[{letter}] toplam={d['total']}, eşleşen(R=1)={d['matched']}, eklenen(R=0)={d['added']}")
+        log(f"[{letter}] toplam={d['total']}, eşleşen(R=1)={d['matched']}, eklenen(R=0)={d['added']}")
+
+    log("---- GENEL ÖZET ----")
+    log(f"Toplam kelime: {total_all}")
+    log(f"Eşleşen (R=1): {matched_all}")
+    log(f"Yeni eklenen (R=0): {added_all}")
+    log(f"✔ Güncellendi ve kaydedildi: {out_path}")
+
+    if manifest_path:
+        total = sum(len(words) for words in parts.values())
+        rescored = sum(res["rescored"] for res in results)
+        log(f"Artımlı: {rescored}/{total} kelime yeniden skorlandı, "
+            f"{total - rescored} kelimenin kararı manifest'ten")
+        save_manifest(manifest_path, {
+            "key": key, "new": new_digest,
+            "sheets": sorted(sheets) if sheets is not None else None,
+            "stream": stream, "out": file_sha256(out_path), "ambiguous": bool(ambiguous_rows),
+            "stats": stats,
+            "groups": {target: res["groups"] for target, res in zip(parts, results)},
+        })
+    return stats
+
+
+# ---------- threshold taraması ----------
+SWEEP_COLUMNS = ["method", "threshold", "sheet", "total", "matched", "single",
+                 "duplicate", "added", "ambiguous_rows"]
+
+
+def parse_thresholds(spec):
+    """
+    "0.3,0.5,0.7" ya da "başlangıç:bitiş:adım" (bitiş dâhil) -> sıralı threshold listesi.
+    Hatalı tanımda ValueError.
+    """
+    try:
+        if ":" in spec:
+            start, stop, step = (float(x) for x in spec.split(":"))
+        else:
+            values = sorted(float(x) for x in spec.split(",") if x.strip())
+    except ValueError:
+        raise ValueError(f"geçersiz threshold tanımı: {spec!r}") from None
+    if ":" in spec:
+        if step <= 0:
+            raise ValueError("adım pozitif olmalı")
+        if start > stop:
+            raise ValueError("başlangıç bitişten büyük olamaz")
+        n = int(round((stop - start) / step))
+        values = [round(start + i * step, 6) for i in range(n + 1)]
+    if not values:
+        raise ValueError("threshold verilmedi")
+    if not all(0 <= v <= 1 for v in values):
+        raise ValueError("threshold'lar 0 ile 1 arasında olmalı")
+    return values
+
+
+def load_old_groups(wb):
+    """
+    { sayfa: { norm: [tokens, ...] } } — ensure_page'in her sayfada göreceği eski
+    satırlar, çalışma kitabı değiştirilmeden (salt okunur) çıkarılır.
+    """
+    pages = {}
+    for sh in wb.sheetnames:
+        ws = wb[sh]
+        idx = dictionary_columns(ws)
+        kcol, dcol = idx.get("KELİME"), idx.get("DEFINITION")
+        groups = pages[sh] = {}
+        if not kcol:
+            continue
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            cell_val = row[kcol - 1] if len(row) >= kcol else None
+            if not cell_val:
+                continue
+            def_val = row[dcol - 1] if dcol and dcol <= len(row) else ""
+            groups.setdefault(normalize_tr(cell_val), []).append(tokenize_def(def_val))
+    return pages
 
-    print("---- GENEL ÖZET ----")
-    print(f"Toplam kelime: {total_all}")
-    print(f"Eşleşen (R=1): {matched_all}")
-    print(f"Yeni eklenen (R=0): {added_all}")
-    print(f"✔ Güncellendi ve kaydedildi: {out_path}")
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--old", required=True)   # HukukSözlüğü.xlsx
-    ap.add_argument("--new", required=True)   # sozlukafull.xlsx
-    ap.add_argument("--out", default="updated_flagged.xlsx")
-    args = ap.parse_args()
+def _score_group(sim_method, old_tokens, words, tfidf):
+    """
+    Bir (sayfa, norm) grubundaki yeni kelimelerin skorları; threshold'dan bağımsız.
+    best_old[j]: j. kelimenin eski satırlara en iyi skoru;
+    pair[j][k]: j. kelimenin gruptaki k. (k<j) kelimeye skoru — k eşiğin altında
+    kalıp yeni satır olarak eklenirse j için aday olur.
+    """
+    entries = [{"tokens": t} for t in old_tokens] + [{"tokens": t} for t in words]
+    n_old = len(old_tokens)
+    best_old = array("d")
+    pair = []
+    for j, toks in enumerate(words):
+        if not toks:
+            best_old.append(0.0)          # boş tanım hiçbir adayla eşleşmez
+            pair.append(array("d"))
+            continue
+        scores = candidate_scores(sim_method, toks, entries[:n_old + j], tfidf)
+        best_old.append(max(scores[:n_old], default=0.0))
+        pair.append(array("d", scores[n_old:]))
+    return best_old, pair
+
+
+def _simulate_group(n_old, words, best_old, pair, threshold, st):
+    """update_and_flag'in bu gruptaki kararlarını verilen threshold için tekrarlar (st'yi günceller)."""
+    appended = []
+    for j, toks in enumerate(words):
+        st["total"] += 1
+        n_cand = n_old + len(appended)
+        if n_cand == 1:
+            st["matched"] += 1
+            st["single"] += 1
+            continue
+        if n_cand > 1 and toks:
+            p = pair[j]
+            best = max(best_old[j] if n_old else 0.0, max((p[k] for k in appended), default=0.0))
+            if best > 0.0 and best >= threshold:
+                st["matched"] += 1
+                st["duplicate"] += 1
+                st["ambiguous_rows"] += n_cand
+                continue
+        st["added"] += 1
+        appended.append(j)
+
+
+def _sweep_sheet(sim_method, items, thresholds, tfidf=None):
+    """
+    Tek (metot, hedef sayfa) bölümü: items = [(eski_tokenlar, yeni_kelime_tokenları), ...]
+    grupları bir kez skorlanır, sonra her threshold için sayılar çıkarılır.
+    """
+    scored = [(len(old_tokens), words) + _score_group(sim_method, old_tokens, words, tfidf)
+              for old_tokens, words in items]
+    out = []
+    for thr in thresholds:
+        st = dict.fromkeys(SWEEP_COLUMNS[3:], 0)
+        for n_old, words, best_old, pair in scored:
+            _simulate_group(n_old, words, best_old, pair, thr, st)
+        out.append(st)
+    return out
+
+
+def sweep_thresholds(old_path, new_path, thresholds, methods=SIM_METHODS, new_data=None,
+                     stats_path=None, sheets=None, workers=1):
+    """
+    Aday skorlarını her metot için bir kez hesaplar, sonra her threshold için
+    update_and_flag'in sayfa bazlı eşleşen/eklenen/çok adaylı sayılarını (eşik
+    altında eklenen satırların sonraki kelimelere aday olması dâhil) birebir
+    çıkarır. Çalışma kitabına yazmaz; SWEEP_COLUMNS satırlarını döndürür.
+    workers > 1 ise (metot, sayfa) bölümleri süreç havuzunda skorlanır.
+    """
+    wb = load_workbook(old_path, read_only=True, data_only=True)
+    if new_data is None:
+        new_data = read_new_words(new_path)
+    old_pages = load_old_groups(wb)
+
+    # yeni kelimeler (hedef sayfa, norm) gruplarına; gruplar birbirini etkilemez
+    groups = {}
+    for sh, pairs in new_data.items():
+        for (kelime, anlam) in pairs:
+            norm = normalize_tr(kelime)
+            if not norm:
+                continue
+            target = target_sheet(kelime, sh)
+            if sheets is not None and target not in sheets:
+                continue
+            groups.setdefault((target, norm), []).append(tokenize_def(anlam))
+
+    parts = {}
+    for (target, norm), words in groups.items():
+        parts.setdefault(target, []).append((old_pages.get(target, {}).get(norm, []), words))
+
+    tfidf = None
+    if "tfidf" in methods:
+        tfidf = TfidfIndex.from_stats(corpus_stats(old_path, wb=wb, cache_path=stats_path))
+
+    order = sorted(parts)
+    tasks = [(m, sh) for m in methods for sh in order]
+    args = ([m for m, _ in tasks], [parts[sh] for _, sh in tasks], [thresholds] * len(tasks),
+            [tfidf if m == "tfidf" else None for m, _ in tasks])
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_sweep_sheet, *args))
+    else:
+        results = list(map(_sweep_sheet, *args))
+    by_task = dict(zip(tasks, results))
+
+    rows = []
+    for method in methods:
+        for ti, thr in enumerate(thresholds):
+            total = dict.fromkeys(SWEEP_COLUMNS[3:], 0)
+            for sheet in order:
+                st = by_task[(method, sheet)][ti]
+                rows.append({"method": method, "threshold": thr, "sheet": sheet, **st})
+                for k in total:
+                    total[k] += st[k]
+            rows.append({"method": method, "threshold": thr, "sheet": "*", **total})
+    return rows
+
+
+# ---------- komut satırı ----------
+SUMMARY_COLUMNS = ["sheet", "total", "matched", "added"]
 
-    # Threshold
+
+# sorular stderr'e: --format json/csv ile stdout sadece özet tablosunu taşır
+def _say(*args):
+    print(*args, file=sys.stderr)
+
+
+def _ask(prompt):
+    sys.stderr.write(prompt)
+    sys.stderr.flush()
+    return input()
+
+
+def ask_threshold():
     try:
-        raw = input("Benzerlik threshold (0-1 arası, boş bırakılırsa 0.5): ").strip()
+        raw = _ask("Benzerlik threshold (0-1 arası, boş bırakılırsa 0.5): ").strip()
         if raw == "":
-            sim_thr = 0.5
-        else:
-            sim_thr = float(raw)
-            if sim_thr < 0 or sim_thr > 1:
-                print("Geçersiz değer, 0.5 kullanılacak.")
-                sim_thr = 0.5
+            return 0.5
+        sim_thr = float(raw)
+        if sim_thr < 0 or sim_thr > 1:
+            _say("Geçersiz değer, 0.5 kullanılacak.")
+            return 0.5
+        return sim_thr
     except Exception:
-        print("Threshold okunamadı, 0.5 kullanılacak.")
-        sim_thr = 0.5
-
-    # Metot seçimi
-    print("Benzerlik metodu seç:")
-    print("  1 = Overlap (|A∩B| / |A|)")
-    print("  2 = Jaccard (|A∩B| / |A∪B|) [varsayılan]")
-    print("  3 = TF-IDF + Cosine")
-    m_raw = input("Seçimin (1/2/3, boş bırakılırsa 2): ").strip()
-
-    if m_raw == "1":
-        sim_method = "overlap"
-    elif m_raw == "3":
-        sim_method = "tfidf"
-    else:
-        sim_method = "jaccard"
+        _say("Threshold okunamadı, 0.5 kullanılacak.")
+        return 0.5
+
+
+def ask_method():
+    _say("Benzerlik metodu seç:")
+    _say("  1 = Overlap (|A∩B| / |A|)")
+    _say("  2 = Jaccard (|A∩B| / |A∪B|) [varsayılan]")
+    _say("  3 = TF-IDF + Cosine")
+    m_raw = _ask("Seçimin (1/2/3, boş bırakılırsa 2): ").strip()
+    return {"1": "overlap", "3": "tfidf"}.get(m_raw, "jaccard")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Eski sözlüğü (HukukSözlüğü) yeni sözlük kelimeleriyle R=1/R=0 işaretler.")
+    ap.add_argument("--old", default="HukukSözlüğü.xlsx")
+    ap.add_argument("--new", default="sozlukafull.xlsx")
+    ap.add_argument("--out", default="sozluk_a_flagged_yeni.xlsx")
+    ap.add_argument("--threshold", type=float,
+                    help="Benzerlik eşiği (0-1); verilmezse terminalde sorulur, terminal yoksa 0.5")
+    ap.add_argument("--method", choices=SIM_METHODS,
+                    help="Benzerlik metodu; verilmezse terminalde sorulur, terminal yoksa jaccard "
+                         "(--sweep ile: verilmezse üçü de)")
+    ap.add_argument("--sheets", help='Sadece bu hedef sayfalar, virgülle (örn. "A,B,Ç")')
+    ap.add_argument("--workers", type=int, default=1, help="Süreç sayısı (sayfa kararları ya da --sweep skorlaması)")
+    ap.add_argument("--format", choices=("text", "json", "csv"), default="text",
+                    help="text: ayrıntılı konsol çıktısı; json/csv: sadece sayfa bazlı özet stdout'a "
+                         "(toplu işler için). --sweep ile tablo biçimi (text = uzantıdan)")
+    ap.add_argument("--stream", action="store_true",
+                    help="Eski sözlüğü akışlı oku/yaz (büyük dosyalarda daha hızlı, az bellek; "
+                         "biçimler korunmaz)")
+    ap.add_argument("--fuzzy", type=float, default=0, metavar="K",
+                    help="Başlığı birebir bulunmayan kelimeye düzenleme uzaklığı en çok K olan "
+                         "başlıkları da aday yap (OCR hataları; harf farkı 1, ı/i, ş/s gibi Türkçe "
+                         "karışıklıklar 0.25). Varsayılan: kapalı")
+    ap.add_argument("--stats", help="tf-idf korpus istatistikleri dosyası (.json.gz); yoksa oluşturulur")
+    ap.add_argument("--manifest", metavar="PATH",
+                    help="Artımlı çalışma dosyası (.json.gz): sadece değişen satırlar ve aynı "
+                         "başlıklı grupları yeniden skorlanır; yoksa oluşturulur")
+    ap.add_argument("--sweep", help='Threshold taraması: "0.3,0.5,0.7" ya da "0.1:0.9:0.05" '
+                                    "(sayfa bazlı sayılar; çalışma kitabı yazılmaz)")
+    ap.add_argument("--sweep-out", default="flag_sweep.csv", help="Tarama tablosu (.csv ya da .json)")
+    args = ap.parse_args()
 
-    update_and_flag(args.old, args.new, args.out,
-                    sim_threshold=sim_thr,
-                    sim_method=sim_method)
+    if args.threshold is not None and not 0 <= args.threshold <= 1:
+        ap.error("--threshold 0 ile 1 arasında olmalı")
+    if args.fuzzy < 0:
+        ap.error("--fuzzy negatif olamaz")
+    if args.fuzzy and args.sweep:
+        ap.error("--fuzzy, --sweep ile kullanılamaz")
+    if args.manifest and args.sweep:
+        ap.error("--manifest, --sweep ile kullanılamaz")
+    thresholds = None
+    if args.sweep:
+        try:
+            thresholds = parse_thresholds(args.sweep)
+        except ValueError as e:
+            ap.error(f"--sweep: {e}")
+    sheets = {x.strip() for x in args.sheets.split(",") if x.strip()} if args.sheets else None
+    fmt = None if args.format == "text" else args.format
+
+    if args.sweep:
+        methods = (args.method,) if args.method else SIM_METHODS
+        rows = sweep_thresholds(args.old, args.new, thresholds, methods=methods,
+                                stats_path=args.stats, sheets=sheets, workers=args.workers)
+        write_table(rows, SWEEP_COLUMNS, args.sweep_out, fmt)
+        print(f"✔ {len(rows)} satırlık threshold taraması yazıldı: {args.sweep_out}")
+        return
+
+    # terminal yoksa (zamanlanmış işler) soru sorma, varsayılanları kullan
+    interactive = sys.stdin.isatty()
+    sim_thr = args.threshold
+    if sim_thr is None:
+        sim_thr = ask_threshold() if interactive else 0.5
+    sim_method = args.method
+    if sim_method is None:
+        sim_method = ask_method() if interactive else "jaccard"
+
+    stats = update_and_flag(args.old, args.new, args.out,
+                            sim_threshold=sim_thr,
+                            sim_method=sim_method,
+                            stats_path=args.stats,
+                            sheets=sheets,
+                            verbose=fmt is None,
+                            workers=args.workers,
+                            stream=args.stream,
+                            fuzzy=args.fuzzy,
+                            manifest_path=args.manifest)
+    if fmt:
+        rows = [{"sheet": sh, **stats[sh]} for sh in sorted(stats)]
+        write_table(rows, SUMMARY_COLUMNS, None, fmt)
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) == 1:
-        sys.argv = [
-            "x",
-            "--old", "HukukSözlüğü.xlsx",
-            "--new", "sozlukafull.xlsx",
-            "--out", "sozluk_a_flagged_yeni.xlsx",
-        ]
     main()
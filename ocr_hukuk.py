@@ -1,7 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
 import os
-from pdf2image import convert_from_path
+import re
+import csv
+import gzip
+import atexit
+import json
+import time
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image, ImageFilter
 import pytesseract
 
+try:
+    import tesserocr    # opsiyonel: kalıcı tesseract motoru (--backend tesserocr)
+except ImportError:
+    tesserocr = None
+
+from sozluk import TR_DOWN_MAP, file_sha256
+
 # 1) Tesseract yolu ve tessdata üst klasörü
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 os.environ["TESSDATA_PREFIX"] = r"C:\Program Files\Tesseract-OCR\tessdata"
@@ -9,27 +29,976 @@ os.environ["TESSDATA_PREFIX"] = r"C:\Program Files\Tesseract-OCR\tessdata"
 # 2) Poppler yolu
 POPPLER_BIN = r"C:\poppler-25.07.0\Library\bin"
 
-# 3) PDF'den ilk 15 sayfayı OCR
-pdf_path = r"C:\pdfs\Hukuk.pdf"
-pages = convert_from_path(
-    pdf_path,
-    dpi=300,
-    first_page=7,
-    last_page=73,
-    poppler_path=POPPLER_BIN
-)
-
-metin = []
-for i, sayfa in enumerate(pages, start=1):
-    # tessdata yolunu ayrıca config ile de veriyoruz (çifte garanti)
-    text = pytesseract.image_to_string(
+# 3) Varsayılan PDF ve sayfa aralığı
+PDF_PATH = r"C:\pdfs\Hukuk.pdf"
+FIRST_PAGE = 7
+LAST_PAGE = 73
+DPI = 300
+LANG = "tur"
+CONFIG = ""
+COLUMN_PSM = 4      # sütun modunda: "tek sütun, değişken boyutlu metin"
+OUTPUT_TXT = "cikti.txt"
+CACHE_DIR = ".ocr_cache"
+
+
+# ---------- sayfa önbelleği ----------
+class OcrCache:
+    """
+    Sayfa bazlı, içerik adresli OCR önbelleği.
+    Anahtar = sha256(pdf içeriği, sayfa no, dpi, dil, tesseract config);
+    PDF değişirse ya da ayarlar değişirse ilgili sayfalar otomatik olarak yeniden OCR'lanır.
+    """
+
+    def __init__(self, cache_dir, pdf_path, **params):
+        self.cache_dir = cache_dir
+        self.pdf_hash = file_sha256(pdf_path)
+        self.params = params
+
+    def key(self, no):
+        raw = json.dumps({"pdf": self.pdf_hash, "page": no, **self.params}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, no):
+        k = self.key(no)
+        return os.path.join(self.cache_dir, k[:2], k + ".txt")
+
+    def get(self, no):
+        try:
+            with open(self.path(no), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, no, text):
+        path = self.path(no)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # yarım yazılmış dosya önbellekte kalmasın: önce geçici dosya, sonra atomik rename
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+# ---------- ön işleme ----------
+# Adımlar her zaman bu sırayla uygulanır (gri → eğiklik → kırpma → ikili);
+# eğiklik düzeltme ve kırpma gri görüntü üzerinde daha temiz çalışır.
+PREP_STEPS = ("gray", "deskew", "crop", "binarize")
+
+
+def otsu_threshold(gray):
+    """Gri görüntünün histogramından Otsu eşiği (0-255)."""
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg, w_bg, best_t, best_var = 0.0, 0, 127, -1.0
+    for t in range(256):
+        w_bg += hist[t]
+        if w_bg == 0:
+            continue
+        w_fg = total - w_bg
+        if w_fg == 0:
+            break
+        sum_bg += t * hist[t]
+        m_bg = sum_bg / w_bg
+        m_fg = (sum_all - sum_bg) / w_fg
+        var = w_bg * w_fg * (m_bg - m_fg) ** 2
+        if var > best_var:
+            best_var, best_t = var, t
+    return best_t
+
+
+def binarize(gray):
+    t = otsu_threshold(gray)
+    lut = [0] * (t + 1) + [255] * (255 - t)
+    return gray.point(lut).convert("1", dither=Image.Dither.NONE)
+
+
+def _row_profile_score(gray):
+    # satır ortalamaları (BOX ile 1 piksel genişliğe küçültmek C tarafında yapılır);
+    # metin satırlarına hizalıysa komşu satırlar arası fark büyük olur
+    h = gray.height
+    rows = list(gray.resize((1, h), Image.Resampling.BOX).getdata())
+    return sum((rows[i + 1] - rows[i]) ** 2 for i in range(h - 1))
+
+
+def estimate_skew(gray, max_angle=2.0, step=0.25, width=800):
+    """Projeksiyon profili ile eğiklik açısı (derece) tahmini; küçültülmüş kopya üzerinde."""
+    small = gray
+    if gray.width > width:
+        small = gray.resize((width, max(1, gray.height * width // gray.width)), Image.Resampling.BILINEAR)
+    best_angle, best_score = 0.0, -1.0
+    n = int(round(max_angle / step))
+    for k in range(-n, n + 1):
+        angle = k * step
+        rotated = small.rotate(angle, resample=Image.Resampling.BILINEAR, fillcolor=255)
+        score = _row_profile_score(rotated)
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def deskew(gray):
+    angle = estimate_skew(gray)
+    if abs(angle) < 0.1:
+        return gray
+    return gray.rotate(angle, resample=Image.Resampling.BICUBIC, fillcolor=255)
+
+
+def crop_text_area(gray, margin=20):
+    """Sayfadaki mürekkepli alanın (iki sütunlu metin bloğu) sınır kutusuna kırp."""
+    scale = 4
+    small = gray.resize((max(1, gray.width // scale), max(1, gray.height // scale)), Image.Resampling.BOX)
+    t = otsu_threshold(small)
+    ink = small.point([255] * (t + 1) + [0] * (255 - t))   # mürekkep = beyaz (getbbox için)
+    ink = ink.filter(ImageFilter.MedianFilter(3))           # tek tük lekeleri at
+    box = ink.getbbox()
+    if not box:
+        return gray
+    l, t_, r, b = (v * scale for v in box)
+    return gray.crop((max(0, l - margin), max(0, t_ - margin),
+                      min(gray.width, r + margin), min(gray.height, b + margin)))
+
+
+def preprocess(img, steps):
+    """`steps` içindeki ön işleme adımlarını PREP_STEPS sırasıyla uygular."""
+    if not steps:
+        return img
+    out = img if img.mode == "L" else img.convert("L")
+    if "deskew" in steps:
+        out = deskew(out)
+    if "crop" in steps:
+        out = crop_text_area(out)
+    if "binarize" in steps:
+        out = binarize(out)
+    return out
+
+
+# ---------- sütun bölme ----------
+def find_gutter(img, lo=0.35, hi=0.65, tol=6):
+    """
+    İki sütun arasındaki boşluğun x koordinatı; belirgin bir boşluk yoksa None.
+    Sayfanın orta bandının (üst/alt başlıklar hariç) sütun ortalamalarına bakılır,
+    [lo, hi] aralığındaki en geniş "neredeyse boş" şeridin ortası seçilir.
+    """
+    gray = img if img.mode == "L" else img.convert("L")
+    band = gray.crop((0, gray.height // 10, gray.width, gray.height * 9 // 10))
+    cols = list(band.resize((band.width, 1), Image.Resampling.BOX).getdata())
+    bg = max(cols)
+    best_len, best_mid, run = 0, None, 0
+    for x in range(int(gray.width * lo), int(gray.width * hi)):
+        if cols[x] >= bg - tol:
+            run += 1
+            if run > best_len:
+                best_len, best_mid = run, x - run // 2
+        else:
+            run = 0
+    window = int(gray.width * hi) - int(gray.width * lo)
+    if best_len < max(3, gray.width // 200) or best_len > window * 0.9:
+        return None     # boşluk yok ya da orta bantta hiç metin yok (boş/tek sütun sayfa)
+    return best_mid
+
+
+def split_columns(img):
+    """
+    Sayfayı sütun görüntülerine böl: [(sütun_görüntüsü, sol_x), ...].
+    Boşluk bulunamazsa sayfanın kendisi tek parça döner.
+    """
+    g = find_gutter(img)
+    if g is None:
+        return [(img, 0)]
+    return [(img.crop((0, 0, g, img.height)), 0), (img.crop((g, 0, img.width, img.height)), g)]
+
+
+def merge_columns(parts, page_info):
+    """Sütun OCR sonuçlarını (soldan sağa) tek sayfa metni ve tek bilgi satırında birleştir."""
+    text = "\n\n".join(t.strip("\n") for t, _ in parts if t.strip()) + "\n"
+    info = {k: v for k, v in page_info.items() if k not in ("col_x", "size")}
+    info["columns"] = len(parts)
+    if all("layout" in i for _, i in parts):
+        info["layout"] = merge_layouts([i["layout"] for _, i in parts], page_info["col_x"],
+                                       page_info["size"])
+    info["ocr_s"] = round(sum(i["ocr_s"] for _, i in parts), 3)
+    if all("chars" in i for _, i in parts):
+        chars = sum(i["chars"] for _, i in parts)
+        info["words"] = sum(i["words"] for _, i in parts)
+        info["chars"] = chars
+        info["low_conf_words"] = sum(i["low_conf_words"] for _, i in parts)
+        info["char_conf"] = round(sum(i["char_conf"] * i["chars"] for _, i in parts) / chars, 2) if chars else 0.0
+    return text, info
+
+
+# ---------- yapısal (kelime kutulu) çıktı ----------
+# Sayfa başına sütunsal (columnar) kayıt: her alan, sayfadaki kelimeler kadar uzun bir liste.
+# Kutular ön işlenmiş sayfa görüntüsünün koordinatlarındadır; satır/paragraf no'ları sayfa içinde tekildir.
+LAYOUT_FIELDS = ("text", "conf", "left", "top", "w", "h", "line", "par", "col")
+
+
+def new_layout():
+    return {k: [] for k in LAYOUT_FIELDS}
+
+
+def merge_layouts(layouts, offsets, size):
+    """Sütun kayıtlarını, sol_x kaydırmasıyla ve tekil satır/paragraf no'larıyla tek sayfada topla."""
+    out = new_layout()
+    line_base = par_base = 0
+    for c, (lay, x0) in enumerate(zip(layouts, offsets)):
+        for k in ("text", "conf", "top", "w", "h"):
+            out[k].extend(lay[k])
+        out["left"].extend(x + x0 for x in lay["left"])
+        out["line"].extend(v + line_base for v in lay["line"])
+        out["par"].extend(v + par_base for v in lay["par"])
+        out["col"].extend([c] * len(lay["text"]))
+        line_base += max(lay["line"], default=-1) + 1
+        par_base += max(lay["par"], default=-1) + 1
+    out["width"], out["height"] = size
+    return out
+
+
+def layout_path(layout_dir, label, no):
+    return os.path.join(layout_dir, f"{label or 'sayfa'}_{no:04d}.json.gz")
+
+
+def write_layout(path, layout):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(layout, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def read_layout(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_volume_layouts(layout_dir, label, first_page, last_page):
+    """Cildin layout_dir'deki sayfa kayıtları, sayfa sırasıyla (kaydı olmayan sayfa atlanır)."""
+    for no in range(first_page, last_page + 1):
+        path = layout_path(layout_dir, label, no)
+        if os.path.exists(path):
+            yield read_layout(path)
+
+
+def iter_layout_lines(layout):
+    """Sayfanın satırlarını okuma sırasıyla verir: (sütun, sol_x, yükseklik, [kelimeler])."""
+    cur, words, left, height, col = None, [], 0, 0, 0
+    for k, w in enumerate(layout["text"]):
+        line = layout["line"][k]
+        if line != cur:
+            if words:
+                yield col, left, height, words
+            cur, words, col = line, [], layout["col"][k]
+            left, height = layout["left"][k], layout["h"][k]
+        words.append(w)
+        height = max(height, layout["h"][k])
+    if words:
+        yield col, left, height, words
+
+
+def iter_layout_entries(layouts, dash="—"):
+    """
+    Kelime kutularından madde başlarını düzen ile bulur ve (kelime, anlam) verir.
+    Tek doğrusal geçiş, regex yok: her sütunda satırların sol kenara göre girintisine
+    bakılır; "—" içeren satırların çoğunluğunun girinti sınıfı (asılı girintide sıfıra
+    yaslı, ilk satır girintisinde içeride) madde başı sınıfıdır. Bu sınıftaki her satır
+    yeni madde başlatır, diğerleri önceki maddenin devamıdır.
+    """
+    cur = None
+    for layout in layouts:
+        lines = list(iter_layout_lines(layout))
+        if not lines:
+            continue
+        heights = sorted(h for _, _, h, _ in lines)
+        tol = heights[len(heights) // 2] * 0.8      # ~ bir harf genişliği
+        margin = {}
+        for col, left, _, _ in lines:
+            margin[col] = min(margin.get(col, left), left)
+        heads = [_split_head(words, dash) for _, _, _, words in lines]
+        head_votes = {}
+        for (col, left, _, _), head in zip(lines, heads):
+            if head is not None:
+                flush = left - margin[col] <= tol
+                head_votes.setdefault(col, [0, 0])[flush] += 1
+        for (col, left, _, words), head in zip(lines, heads):
+            votes = head_votes.get(col, [0, 1])
+            head_flush = votes[1] >= votes[0]
+            flush = left - margin[col] <= tol
+            if flush == head_flush and head is not None:
+                if cur is not None:
+                    yield _finish_entry(cur)
+                cur = (head[0], [head[1]])
+            elif cur is not None:
+                cur[1].append(" ".join(words))
+    if cur is not None:
+        yield _finish_entry(cur)
+
+
+def _split_head(words, dash):
+    """Satırı ilk "—" işaretinden (ayrı kelime ya da 'a. d.—' gibi bitişik) böl; terim boşsa None."""
+    for k, w in enumerate(words):
+        if dash in w:
+            before, after = w.split(dash, 1)
+            term = " ".join(words[:k] + ([before] if before else []))
+            if not term.strip():
+                return None
+            return term, " ".join(([after] if after else []) + words[k + 1:])
+    return None
+
+
+def _finish_entry(cur):
+    term, parts = cur
+    out = ""
+    for p in parts:
+        if not p:
+            continue
+        if out.endswith("-") and p[:1].isalpha():
+            out = out[:-1] + p            # 'ehli-' + 'yeti' -> 'ehliyeti'
+        else:
+            out = f"{out} {p}" if out else p
+    return term.strip(), out.strip()
+
+
+# ---------- worker ----------
+def _init_worker():
+    # Her süreç tek sayfa işliyor; tesseract'ın kendi OpenMP thread'leri
+    # çekirdekleri birbirine kaptırmasın.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def make_options(dpi=DPI, lang=LANG, config=CONFIG, batch=1, prep=(), min_conf=0, max_dpi=DPI,
+                 columns=False, column_psm=COLUMN_PSM, backend="pytesseract"):
+    """
+    Worker'lara giden OCR ayarları (picklable dict).
+    prep: PREP_STEPS alt kümesi; min_conf > 0 ise karakter güveni bu değerin altında
+    kalan sayfalar max_dpi ile yeniden render edilip tekrar OCR'lanır (uyarlamalı dpi).
+    columns: sayfalar sütunlara bölünüp her sütun column_psm ile ayrı OCR'lanır.
+    backend: BACKENDS'ten biri; "tesserocr" her worker'da kalıcı motor kullanır.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"bilinmeyen OCR motoru: {backend}")
+    return {
+        "dpi": dpi, "lang": lang, "config": config, "batch": batch,
+        "prep": tuple(s for s in PREP_STEPS if s in prep),
+        "min_conf": min_conf, "max_dpi": max(dpi, max_dpi),
+        "columns": bool(columns), "column_psm": column_psm, "backend": backend,
+    }
+
+
+def cache_params(opts):
+    """Önbellek anahtarına giren ayarlar (varsayılanlar eski anahtarları bozmaz)."""
+    params = {"dpi": opts["dpi"], "lang": opts["lang"], "config": opts["config"]}
+    if opts["prep"]:
+        params["prep"] = list(opts["prep"])
+    if opts["min_conf"]:
+        params["min_conf"] = opts["min_conf"]
+        params["max_dpi"] = opts["max_dpi"]
+    if opts["columns"]:
+        # sütunlar config'teki --psm yerine column_psm ile okunur (_tess_config)
+        params["config"] = _PSM_RE.sub("", opts["config"]).strip()
+        params["columns"] = True
+        params["column_psm"] = opts["column_psm"]
+    if opts["backend"] != "pytesseract":
+        params["backend"] = opts["backend"]
+    return params
+
+
+def iter_pages(pdf_path, first_page, last_page, dpi=DPI, batch=1, grayscale=False):
+    """
+    Sayfaları tek tek (ya da `batch` sayfalık küçük gruplar halinde) render edip
+    (pdf_sayfa_no, PIL.Image) olarak verir. Bir grup tüketilmeden sonraki render
+    edilmez; bellekte aynı anda en fazla `batch` sayfa görüntüsü bulunur.
+    """
+    for a, b in split_range(first_page, last_page, batch):
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=a,
+            last_page=b,
+            poppler_path=POPPLER_BIN,
+            grayscale=grayscale,
+        )
+        for no in range(a, b + 1):
+            if not images:
+                break
+            sayfa = images.pop(0)
+            try:
+                yield no, sayfa
+            finally:
+                sayfa.close()
+        del images
+
+
+# ---------- OCR motoru ----------
+# "pytesseract": her çağrıda yeni bir tesseract süreci + geçici görüntü dosyası.
+# "tesserocr":   süreç başına kalıcı tesseract motoru (C API), görüntü bellekten verilir.
+BACKENDS = ("pytesseract", "tesserocr")
+_ENGINES = {}   # (dil, psm, -c değişkenleri) -> PyTessBaseAPI; her worker sürecinin kendi motorları
+
+
+def _parse_config(config):
+    """'--psm 4 --dpi 300 -c ad=değer' biçimindeki config'i (psm, dpi, değişkenler) olarak ayır."""
+    psm, dpi, variables = None, None, {}
+    toks = config.split()
+    for k, tok in enumerate(toks[:-1]):
+        if tok == "--psm":
+            psm = int(toks[k + 1])
+        elif tok == "--dpi":
+            dpi = int(toks[k + 1])
+        elif tok == "-c" and "=" in toks[k + 1]:
+            name, val = toks[k + 1].split("=", 1)
+            variables[name] = val
+    return psm, dpi, variables
+
+
+def _engine(lang, config):
+    if tesserocr is None:
+        raise RuntimeError("tesserocr kurulu değil (pip install tesserocr); --backend pytesseract kullanın.")
+    psm, dpi, variables = _parse_config(config)
+    # -c değişkenleri motorda kalıcıdır; anahtara girmezse bir çağrınınki sonrakilere taşınır
+    key = (lang, psm, tuple(sorted(variables.items())))
+    api = _ENGINES.get(key)
+    if api is None:
+        kwargs = {"lang": lang, "path": os.environ.get("TESSDATA_PREFIX", "")}
+        if psm is not None:
+            kwargs["psm"] = psm
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        _ENGINES[key] = api
+        if len(_ENGINES) == 1:
+            atexit.register(_close_engines)
+        for name, val in variables.items():
+            api.SetVariable(name, val)
+    return api, dpi
+
+
+def _close_engines():
+    for api in _ENGINES.values():
+        api.End()
+    _ENGINES.clear()
+
+
+def _set_image(api, img, dpi):
+    # PNG/temp dosya yok: ham piksel tamponu doğrudan motora verilir
+    if img.mode not in ("L", "RGB"):
+        img = img.convert("L")
+    bpp = 3 if img.mode == "RGB" else 1
+    api.SetImageBytes(img.tobytes(), img.width, img.height, bpp, bpp * img.width)
+    if dpi:
+        api.SetSourceResolution(dpi)
+
+
+def _summarize_words(words, layout=False):
+    """
+    words: (paragraf_anahtarı, satır_anahtarı, kelime, güven, (sol, üst, gen, yük)) dizisi.
+    Metni satır/paragraf yapısıyla yeniden kurar ve kelime güvenlerinden karakter
+    ağırlıklı ortalama güveni hesaplar. Dönen değer: (metin, bilgi)
+    layout=True ise bilgi["layout"] sütunsal kelime kaydını (LAYOUT_FIELDS) içerir.
+    """
+    parts, prev_par, prev_line = [], None, None
+    n_words = low = chars = 0
+    conf_sum = 0.0
+    lay = new_layout() if layout else None
+    line_no = par_no = -1
+    for par, line, w, conf, box in words:
+        if prev_line is not None:
+            parts.append(" " if line == prev_line else ("\n" if par == prev_par else "\n\n"))
+        if line != prev_line:
+            line_no += 1
+        if par != prev_par:
+            par_no += 1
+        parts.append(w)
+        prev_par, prev_line = par, line
+        if lay is not None:
+            for k, v in zip(LAYOUT_FIELDS, (w, round(conf, 1), *box, line_no, par_no, 0)):
+                lay[k].append(v)
+
+        n_words += 1
+        chars += len(w)
+        conf_sum += conf * len(w)
+        if conf < 60:
+            low += 1
+    text = "".join(parts) + "\n" if parts else ""
+    info = {"words": n_words, "chars": chars, "low_conf_words": low,
+            "char_conf": round(conf_sum / chars, 2) if chars else 0.0}
+    if lay is not None:
+        info["layout"] = lay
+    return text, info
+
+
+def ocr_image(sayfa, lang=LANG, config=CONFIG, backend="pytesseract"):
+    if backend == "tesserocr":
+        api, dpi = _engine(lang, config)
+        _set_image(api, sayfa, dpi)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(
         sayfa,
-        lang="tur",
+        lang=lang,
+        config=config,
     )
-    metin.append(f"--- Sayfa {i} ---\n{text}\n")
-    print(f"{i}. sayfa OCR tamam")
 
-with open("cikti.txt", "w", encoding="utf-8") as f:
-    f.write("".join(metin))
 
-print("✅ İlk 15 sayfa OCR tamamlandı. cikti.txt oluşturuldu.")
+def _iter_words_pytesseract(sayfa, lang, config):
+    d = pytesseract.image_to_data(sayfa, lang=lang, config=config,
+                                  output_type=pytesseract.Output.DICT)
+    for i, w in enumerate(d["text"]):
+        if d["level"][i] != 5 or not w or not w.strip():
+            continue
+        par = (d["block_num"][i], d["par_num"][i])
+        box = (d["left"][i], d["top"][i], d["width"][i], d["height"][i])
+        yield par, par + (d["line_num"][i],), w, float(d["conf"][i]), box
+
+
+def _iter_words_tesserocr(sayfa, lang, config):
+    api, dpi = _engine(lang, config)
+    _set_image(api, sayfa, dpi)
+    api.Recognize()
+    RIL = tesserocr.RIL
+    par = line = 0
+    for it in tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+        if it.IsAtBeginningOf(RIL.PARA):
+            par += 1
+        if it.IsAtBeginningOf(RIL.TEXTLINE):
+            line += 1
+        w = it.GetUTF8Text(RIL.WORD)
+        if w and w.strip():
+            x1, y1, x2, y2 = it.BoundingBox(RIL.WORD)
+            yield par, line, w, it.Confidence(RIL.WORD), (x1, y1, x2 - x1, y2 - y1)
+
+
+def ocr_image_data(sayfa, lang=LANG, config=CONFIG, backend="pytesseract", layout=False):
+    """
+    Kelime düzeyinde OCR: (metin, {"words", "chars", "char_conf", "low_conf_words"[, "layout"]}) döner.
+    """
+    if backend == "tesserocr":
+        return _summarize_words(_iter_words_tesserocr(sayfa, lang, config), layout)
+    return _summarize_words(_iter_words_pytesseract(sayfa, lang, config), layout)
+
+
+_PSM_RE = re.compile(r"\s*--psm\s+\S+")
+
+
+def _tess_config(opts, dpi, psm=None):
+    config = opts["config"]
+    if (opts["prep"] or opts["backend"] != "pytesseract") and "--dpi" not in config:
+        # ön işlenmiş / bellekten verilen görüntüde çözünürlük bilgisi yok; tesseract'a gerçeğini söyle
+        config = f"{config} --dpi {dpi}"
+    if psm is not None:
+        # config'teki --psm'in yerine geçer; ikisi birden verilirse hangisinin geçeceği belirsiz
+        config = f"{_PSM_RE.sub('', config)} --psm {psm}"
+    return config.strip()
+
+
+def _ocr(img, opts, config):
+    """Güven istenmişse image_to_data, yoksa düz image_to_string; (metin, bilgi) döner."""
+    t0 = time.perf_counter()
+    if opts["min_conf"] or opts.get("report") or opts.get("layout"):
+        text, info = ocr_image_data(img, lang=opts["lang"], config=config, backend=opts["backend"],
+                                    layout=bool(opts.get("layout")))
+    else:
+        text, info = ocr_image(img, lang=opts["lang"], config=config, backend=opts["backend"]), {}
+    info["ocr_s"] = round(time.perf_counter() - t0, 3)
+    return text, info
+
+
+def _timed(iterable):
+    """Her elemanı, onu üretmek için geçen süreyle birlikte verir (render süresi ölçümü)."""
+    it = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        yield item, time.perf_counter() - t0
+
+
+def _ocr_page(sayfa, opts, dpi):
+    """Tek sayfa: ön işleme + OCR (sütun modunda sütun sütun). Dönen değer: (metin, bilgi)"""
+    t0 = time.perf_counter()
+    img = preprocess(sayfa, opts["prep"])
+    page_info = {"dpi": dpi, "prep_s": round(time.perf_counter() - t0, 3)}
+    if opts["columns"]:
+        cols = split_columns(img)
+        parts = [ocr_column(col, opts, dpi) for col, _ in cols]
+        page_info.update(col_x=[x for _, x in cols], size=img.size)
+        text, info = merge_columns(parts, page_info)
+    else:
+        text, info = _ocr(img, opts, _tess_config(opts, dpi))
+        info.update(page_info)
+        if "layout" in info:
+            info["layout"]["width"], info["layout"]["height"] = img.size
+    if img is not sayfa:
+        img.close()
+    return text, info
+
+
+def ocr_column(img, opts, dpi):
+    """Sütun modu, 2. aşama (worker görevi): tek sütun görüntüsünü tek sütun PSM ile OCR'lar."""
+    return _ocr(img, opts, _tess_config(opts, dpi, psm=opts["column_psm"]))
+
+
+def render_columns(pdf_path, first_page, last_page, opts):
+    """
+    Sütun modu, 1. aşama (worker görevi): sayfaları render edip ön işler ve sütunlara böler.
+    Dönen değer: [(pdf_sayfa_no, [sütun görüntüsü, ...], bilgi), ...]; bilgi["col_x"] sütunların sol x'i
+    """
+    out = []
+    pages = iter_pages(pdf_path, first_page, last_page, dpi=opts["dpi"],
+                       batch=opts["batch"], grayscale=bool(opts["prep"]))
+    for (no, sayfa), render_s in _timed(pages):
+        t0 = time.perf_counter()
+        img = preprocess(sayfa, opts["prep"])
+        split = split_columns(img)
+        # iter_pages sayfayı kapatacak; sütunlar ondan bağımsız kopya olsun
+        cols = [c.copy() if c is sayfa else c for c, _ in split]
+        info = {"dpi": opts["dpi"], "render_s": round(render_s, 3),
+                "prep_s": round(time.perf_counter() - t0, 3), "retried": 0,
+                "col_x": [x for _, x in split], "size": img.size}
+        out.append((no, cols, info))
+    return out
+
+
+def iter_page_texts(pdf_path, first_page, last_page, opts, cache=None):
+    """
+    [first_page, last_page] aralığını sayfa sayfa render edip OCR'lar,
+    (pdf_sayfa_no, metin, bilgi) verir. bilgi: sayfa bazlı süreler (ve varsa güven).
+    cache verilirse her sayfa biter bitmez önbelleğe yazılır (çökmede kaybolmaz).
+    """
+    gray = bool(opts["prep"])
+    pages = iter_pages(pdf_path, first_page, last_page, dpi=opts["dpi"],
+                       batch=opts["batch"], grayscale=gray)
+    for (no, sayfa), render_s in _timed(pages):
+        text, info = _ocr_page(sayfa, opts, opts["dpi"])
+        info["render_s"] = round(render_s, 3)
+        info["retried"] = 0
+
+        # uyarlamalı dpi: güven düşükse sadece bu sayfayı yüksek dpi ile tekrar dene
+        if opts["min_conf"] and opts["max_dpi"] > opts["dpi"] and info["char_conf"] < opts["min_conf"]:
+            t0 = time.perf_counter()
+            for _, hi in iter_pages(pdf_path, no, no, dpi=opts["max_dpi"], grayscale=gray):
+                render_s = time.perf_counter() - t0
+                text2, info2 = _ocr_page(hi, opts, opts["max_dpi"])
+                best = dict(info2) if info2["char_conf"] >= info["char_conf"] else dict(info)
+                if best["dpi"] == opts["max_dpi"]:
+                    text = text2
+                # iki denemenin toplam maliyeti raporlansın
+                best["render_s"] = round(info["render_s"] + render_s, 3)
+                best["prep_s"] = round(info["prep_s"] + info2["prep_s"], 3)
+                best["ocr_s"] = round(info["ocr_s"] + info2["ocr_s"], 3)
+                best["retried"] = 1
+                info = best
+
+        if cache is not None:
+            cache.put(no, text)
+        yield no, text, info
+
+
+def ocr_page_range(*args, **kwargs):
+    """Worker görevi: iter_page_texts ile aynı, ama görüntüler değil sadece metinler listesi döner."""
+    return list(iter_page_texts(*args, **kwargs))
+
+
+def split_range(first_page, last_page, chunk):
+    """Sayfa aralığını en fazla `chunk` sayfalık parçalara böl."""
+    chunk = max(1, int(chunk))
+    return [(a, min(a + chunk - 1, last_page)) for a in range(first_page, last_page + 1, chunk)]
+
+
+def split_pages(pages, chunk):
+    """Sıralı sayfa listesini, ardışık ve en fazla `chunk` sayfalık (ilk, son) aralıklara böl."""
+    chunk = max(1, int(chunk))
+    ranges = []
+    for no in pages:
+        if ranges and ranges[-1][1] == no - 1 and no - ranges[-1][0] < chunk:
+            ranges[-1] = (ranges[-1][0], no)
+        else:
+            ranges.append((no, no))
+    return ranges
+
+
+# ---------- OCR (seri / paralel, tek ya da çok PDF) ----------
+def iter_ocr_batch(volumes, workers=1, chunk=2, cache_dir=CACHE_DIR, report=None, layout_dir=None,
+                   **ocr_opts):
+    """
+    volumes: [(etiket, pdf_yolu, ilk_sayfa, son_sayfa), ...]
+    Her cildin sayfalarını OCR'lar ve (cilt_indeksi, pdf_sayfa_no, metin) verir;
+    her cilt kendi içinde sayfa sırasıyla gelir, ciltler arası sıra serbesttir.
+
+    Tüm ciltlerin (önbellekte olmayan) sayfaları `chunk` sayfalık görevler halinde
+    TEK ortak süreç havuzuna verilir; küçük bir cilt bittiğinde boşalan çekirdek
+    hemen sıradaki cildin sayfalarını alır. Sırası gelmemiş sayfaların sadece metni
+    beklemede tutulur.
+
+    ocr_opts: make_options argümanları (dpi, lang, config, batch, prep, min_conf, max_dpi).
+    report bir liste ise OCR'lanan her sayfa için süre/güven satırı eklenir.
+    layout_dir verilirse her sayfanın kelime kutuları/güvenleri oraya sütunsal
+    .json.gz olarak yazılır (bkz. LAYOUT_FIELDS, iter_layout_entries).
+    """
+    opts = make_options(**ocr_opts)
+    opts["report"] = report is not None
+    opts["layout"] = layout_dir is not None
+    states = []
+    for label, pdf_path, first_page, last_page in volumes:
+        prefix = f"[{label}] " if label else ""
+        n_pages = pdfinfo_from_path(pdf_path)["Pages"]
+        if last_page > n_pages:
+            # PDF'te olmayan sayfalar hiç gelmez; cilt sessizce eksik kalmasın
+            print(f"⚠️ {prefix}son sayfa {last_page}, PDF {n_pages} sayfa: {n_pages}. sayfada bitiriliyor.")
+            last_page = n_pages
+        cache = None
+        if cache_dir:
+            cache = OcrCache(cache_dir, pdf_path, **cache_params(opts))
+        ready, todo = {}, []
+        for no in range(first_page, last_page + 1):
+            text = cache.get(no) if cache is not None else None
+            if text is not None and layout_dir and not os.path.exists(layout_path(layout_dir, label, no)):
+                text = None     # metin önbellekte ama kelime kutuları yok: yeniden OCR
+            if text is None:
+                todo.append(no)
+            else:
+                ready[no] = text
+        if ready:
+            print(f"♻️ {prefix}{len(ready)} sayfa önbellekten alındı, {len(todo)} sayfa OCR'lanacak.")
+        states.append({
+            "pdf": pdf_path, "first": first_page, "last": last_page, "cache": cache,
+            "ready": ready, "todo": todo, "next": first_page, "prefix": prefix, "label": label,
+        })
+
+    def drain(i):
+        # cildin sırası gelen (ardışık) sayfalarını ver
+        st = states[i]
+        while st["next"] <= st["last"] and st["next"] in st["ready"]:
+            no = st["next"]
+            yield i, no, st["ready"].pop(no)
+            st["next"] += 1
+
+    def done(i, no, text, info):
+        st = states[i]
+        st["ready"][no] = text
+        layout = info.pop("layout", None)
+        if layout_dir and layout is not None:
+            layout["page"] = no
+            write_layout(layout_path(layout_dir, st["label"], no), layout)
+        print(f"{st['prefix']}{no - st['first'] + 1}. sayfa OCR tamam")
+        if report is not None:
+            report.append({"label": st["label"], "page": no, **info})
+
+    for i in range(len(states)):
+        yield from drain(i)
+
+    tasks = [(i, a, b) for i, st in enumerate(states) for a, b in split_pages(st["todo"], chunk)]
+    if workers <= 1:
+        for i, a, b in tasks:
+            st = states[i]
+            for no, text, info in iter_page_texts(st["pdf"], a, b, opts, st["cache"]):
+                done(i, no, text, info)
+                yield from drain(i)
+        return
+
+    if not opts["columns"]:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+            futures = {
+                ex.submit(ocr_page_range, states[i]["pdf"], a, b, opts, states[i]["cache"]): i
+                for i, a, b in tasks
+            }
+            for fut in as_completed(futures):
+                i = futures[fut]
+                for no, text, info in fut.result():
+                    done(i, no, text, info)
+                yield from drain(i)
+        return
+
+    # Sütun modu: render görevleri sayfaları sütunlara böler, her sütun ayrı bir OCR
+    # görevi olarak aynı havuza girer. Bekleyen sütun görüntüsü sayısı sınırlı tutulur:
+    # kuyrukta yeterince OCR işi varken yeni sayfa render edilmez.
+    queue = deque(tasks)
+    inflight = {}        # future -> ("render", i) | ("ocr", i, no, sütun)
+    parts = {}           # (i, no) -> [(metin, bilgi) | None, ...]
+    page_infos = {}      # (i, no) -> render/ön işleme bilgisi
+    n_render = n_ocr = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+        def refill():
+            nonlocal n_render
+            while queue and n_render < workers and n_ocr < 2 * workers:
+                i, a, b = queue.popleft()
+                inflight[ex.submit(render_columns, states[i]["pdf"], a, b, opts)] = ("render", i)
+                n_render += 1
+
+        refill()
+        while inflight:
+            finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                kind = inflight.pop(fut)
+                if kind[0] == "render":
+                    n_render -= 1
+                    i = kind[1]
+                    for no, cols, info in fut.result():
+                        parts[(i, no)] = [None] * len(cols)
+                        page_infos[(i, no)] = info
+                        for c, col in enumerate(cols):
+                            inflight[ex.submit(ocr_column, col, opts, info["dpi"])] = ("ocr", i, no, c)
+                            n_ocr += 1
+                    continue
+
+                n_ocr -= 1
+                _, i, no, c = kind
+                slot = parts[(i, no)]
+                slot[c] = fut.result()
+                if any(x is None for x in slot):
+                    continue
+                del parts[(i, no)]
+                text, info = merge_columns(slot, page_infos.pop((i, no)))
+                if states[i]["cache"] is not None:
+                    states[i]["cache"].put(no, text)
+                done(i, no, text, info)
+                yield from drain(i)
+            refill()
+
+
+def iter_ocr(pdf_path, first_page, last_page, **kwargs):
+    """Tek PDF için iter_ocr_batch; (pdf_sayfa_no, metin) çiftlerini sayfa sırasıyla verir."""
+    for _, no, text in iter_ocr_batch([("", pdf_path, first_page, last_page)], **kwargs):
+        yield no, text
+
+
+def format_page(no, text, first_page):
+    """Parser'ların beklediği '--- Sayfa N ---' biçimi (N, aralık içindeki 1-bazlı sıra)."""
+    return f"--- Sayfa {no - first_page + 1} ---\n{text}\n"
+
+
+def write_ocr(pages, out_path, first_page):
+    """OCR sonuçlarını geldikçe dosyaya yazar; çökme anında o ana kadarki sayfalar diskte kalır."""
+    n = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        for no, text in pages:
+            f.write(format_page(no, text, first_page))
+            f.flush()
+            n += 1
+    return n
+
+
+# ---------- toplu (manifest) çalıştırma ----------
+def load_manifest(path):
+    """
+    Manifest JSON: [{"harf": "A", "pdf": "...", "first": 7, "last": 73, "out": "ciktiafull.txt"}, ...]
+    "out" verilmezse cikti<harf>full.txt kullanılır.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    volumes = []
+    for item in items:
+        harf = str(item["harf"]).strip()
+        out = item.get("out") or f"cikti{harf.translate(TR_DOWN_MAP).lower()}full.txt"
+        volumes.append({
+            "harf": harf,
+            "pdf": item["pdf"],
+            "first": int(item["first"]),
+            "last": int(item["last"]),
+            "out": out,
+        })
+    return volumes
+
+
+def run_batch(volumes, **kwargs):
+    """Manifestteki tüm ciltleri tek havuzda OCR'lar, her harf için ayrı çıktı dosyası yazar."""
+    files = [open(v["out"], "w", encoding="utf-8") for v in volumes]
+    counts = [0] * len(volumes)
+    try:
+        specs = [(v["harf"], v["pdf"], v["first"], v["last"]) for v in volumes]
+        for i, no, text in iter_ocr_batch(specs, **kwargs):
+            files[i].write(format_page(no, text, volumes[i]["first"]))
+            files[i].flush()
+            counts[i] += 1
+    finally:
+        for f in files:
+            f.close()
+    return counts
+
+
+# ---------- süre / güven raporu ----------
+REPORT_COLUMNS = ["label", "page", "dpi", "columns", "render_s", "prep_s", "ocr_s",
+                  "words", "char_conf", "low_conf_words", "retried"]
+
+
+def write_report(rows, path):
+    """Sayfa bazlı süre ve karakter güveni raporunu CSV olarak yazar, kısa özet basar."""
+    rows = sorted(rows, key=lambda r: (r["label"], r["page"]))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=REPORT_COLUMNS, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    if not rows:
+        print(f"📊 Rapor boş (tüm sayfalar önbellekten geldi): {path}")
+        return
+    n = len(rows)
+    avg = lambda k: sum(r.get(k, 0) for r in rows) / n
+    print(f"📊 {n} sayfa: render={avg('render_s'):.2f}s, ön işleme={avg('prep_s'):.2f}s, "
+          f"ocr={avg('ocr_s'):.2f}s, karakter güveni={avg('char_conf'):.1f}, "
+          f"yeniden denenen={sum(r.get('retried', 0) for r in rows)} → {path}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--manifest", help="Çok ciltli toplu OCR için manifest JSON (verilirse --pdf/--first/--last/--out yok sayılır)")
+    ap.add_argument("--pdf", default=PDF_PATH)
+    ap.add_argument("--first", type=int, default=FIRST_PAGE)
+    ap.add_argument("--last", type=int, default=LAST_PAGE)
+    ap.add_argument("--out", default=OUTPUT_TXT)
+    ap.add_argument("--dpi", type=int, default=DPI)
+    ap.add_argument("--lang", default=LANG)
+    ap.add_argument("--config", default=CONFIG, help='Ek tesseract ayarları (örn. "--psm 6")')
+    ap.add_argument("--workers", type=int, default=1,
+                    help="OCR süreç sayısı (1 = seri, örn. 16 çekirdekte 16)")
+    ap.add_argument("--chunk", type=int, default=2,
+                    help="Bir worker'a tek seferde verilen sayfa sayısı")
+    ap.add_argument("--batch", type=int, default=1,
+                    help="Aynı anda render edilip bellekte tutulan sayfa sayısı")
+    ap.add_argument("--prep", default="",
+                    help="Ön işleme adımları, virgülle: gray,deskew,crop,binarize (örn. düşük dpi ile)")
+    ap.add_argument("--min-conf", type=float, default=0,
+                    help="Karakter güveni bunun altındaki sayfalar --max-dpi ile yeniden OCR'lanır")
+    ap.add_argument("--max-dpi", type=int, default=DPI)
+    ap.add_argument("--columns", action="store_true",
+                    help="Sayfaları sütunlara bölüp her sütunu ayrı (tek sütun PSM ile) OCR'la")
+    ap.add_argument("--column-psm", type=int, default=COLUMN_PSM)
+    ap.add_argument("--backend", choices=BACKENDS, default="pytesseract",
+                    help="tesserocr: worker başına kalıcı tesseract motoru, görüntü bellekten")
+    ap.add_argument("--layout-dir",
+                    help="Sayfa başına kelime kutuları/girinti/güven kaydı (.json.gz) yazılacak klasör")
+    ap.add_argument("--report", help="Sayfa bazlı süre/güven raporu (CSV)")
+    ap.add_argument("--cache-dir", default=CACHE_DIR, help="Sayfa bazlı OCR önbelleği klasörü")
+    ap.add_argument("--no-cache", action="store_true", help="Önbelleği kullanma")
+    args = ap.parse_args()
+
+    prep = [p.strip() for p in args.prep.split(",") if p.strip()]
+    unknown = [p for p in prep if p not in PREP_STEPS]
+    if unknown:
+        ap.error(f"bilinmeyen ön işleme adımı: {', '.join(unknown)}")
+    if args.backend == "tesserocr" and tesserocr is None:
+        ap.error("tesserocr kurulu değil (pip install tesserocr)")
+    if args.columns and args.min_conf:
+        ap.error("--min-conf (uyarlamalı dpi) sütun modu ile birlikte kullanılamaz")
+    report = [] if args.report else None
+
+    opts = dict(workers=args.workers, chunk=args.chunk, dpi=args.dpi, lang=args.lang,
+                config=args.config, batch=args.batch, prep=prep,
+                min_conf=args.min_conf, max_dpi=args.max_dpi,
+                columns=args.columns, column_psm=args.column_psm,
+                backend=args.backend, report=report, layout_dir=args.layout_dir,
+                cache_dir=None if args.no_cache else args.cache_dir)
+
+    if args.manifest:
+        volumes = load_manifest(args.manifest)
+        counts = run_batch(volumes, **opts)
+        for v, n in zip(volumes, counts):
+            print(f"✅ [{v['harf']}] {n} sayfa → {v['out']}")
+        print(f"✅ Toplam {sum(counts)} sayfa, {len(volumes)} cilt OCR tamamlandı.")
+    else:
+        n = write_ocr(iter_ocr(args.pdf, args.first, args.last, **opts), args.out, args.first)
+        print(f"✅ {n} sayfa OCR tamamlandı. {args.out} oluşturuldu.")
+
+    if report is not None:
+        write_report(report, args.report)
+
+
+if __name__ == "__main__":
+    main()
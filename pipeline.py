@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR → ayrıştırma → düzeltme → işaretleme zincirini tek süreçte çalıştırır.
+
+Aşamalar arasında veri bellekte aktarılır: OCR metni parser'a, maddeler
+correct_excel'e, düzeltilmiş harf grupları doğrudan flag.update_and_flag'e gider;
+ara txt/xlsx dosyaları sadece --save-txt / --save-xlsx ile istenirse yazılır.
+--layout-dir ile maddeler metin yerine sayfa düzeninden (kelime kutularının girintisi,
+ocr_hukuk.iter_layout_entries) ayrılır.
+"""
+import io
+import argparse
+
+import pandas as pd
+
+import ocr_hukuk
+import correct_excel
+import flag
+from sozluk import (
+    iter_entries, clean_txt, parse_entries_with_prefix_merge,
+    group_by_letter, tr_sort_key, sheet_name_for, write_letter_sheets, SIM_METHODS,
+    RATIO_BACKENDS,
+)
+
+
+def ocr_texts(volumes, **ocr_opts):
+    """Ciltleri tek havuzda OCR'lar; her cilt için '--- Sayfa N ---' biçiminde tam metin döner."""
+    specs = [(v["harf"], v["pdf"], v["first"], v["last"]) for v in volumes]
+    pages = [[] for _ in volumes]
+    for i, no, text in ocr_hukuk.iter_ocr_batch(specs, **ocr_opts):
+        pages[i].append(ocr_hukuk.format_page(no, text, volumes[i]["first"]))
+    return ["".join(p) for p in pages]
+
+
+def layout_entries(volumes, layout_dir):
+    """Ciltlerin layout_dir'deki sayfa düzenlerinden (kelime, anlam) maddeleri, cilt sırasıyla."""
+    for v in volumes:
+        yield from ocr_hukuk.iter_layout_entries(
+            ocr_hukuk.iter_volume_layouts(layout_dir, v["harf"], v["first"], v["last"]))
+
+
+def parse_texts(texts, correct=True, sim_backend="difflib", correct_fuzzy=0, entries=None):
+    """
+    OCR metinlerinden { harf: [(kelime, anlam), ...] } grupları üretir.
+    correct=True ise her harf grubu, aynı metnin önek birleştirmeli ayrıştırmasıyla
+    correct_excel.correct_sheet üzerinden düzeltilir (correct_fuzzy: son kelime için
+    bulanık arama sınırı, 0 = kapalı).
+    entries ((kelime, anlam) maddeleri, örn. layout_entries) verilirse gruplar metin
+    yerine bunlardan kurulur; metinler sadece düzeltme için kullanılır.
+    """
+    groups, txt_groups = {}, {}
+    if entries is not None:
+        groups = group_by_letter(entries)
+    for text in texts:
+        if entries is None:
+            for ch, rows in group_by_letter(iter_entries(io.StringIO(text))).items():
+                groups.setdefault(ch, []).extend(rows)
+        if correct:
+            for ch, rows in group_by_letter(parse_entries_with_prefix_merge(clean_txt(text))).items():
+                txt_groups.setdefault(ch, []).extend(rows)
+
+    changes = []
+    for ch, rows in groups.items():
+        # xlsx ara dosyasındaki sırayla aynı: Türkçe alfabe sırası (kararlı)
+        rows.sort(key=lambda r: tr_sort_key(r[0]))
+        if not correct:
+            continue
+        df = pd.DataFrame(rows, columns=["kelime", "anlam"])
+        df, sheet_changes = correct_excel.correct_sheet(df, txt_groups.get(ch, []), sim_backend,
+                                                        correct_fuzzy)
+        for c in sheet_changes:
+            c["sheet"] = sheet_name_for(ch)
+        changes.extend(sheet_changes)
+        groups[ch] = list(zip(df["kelime"], df["anlam"]))
+    return groups, changes
+
+
+def run_pipeline(old_path, out_path, volumes=None, txt_paths=(), correct=True, sim_backend="difflib",
+                 sim_threshold=0.5, sim_method="jaccard", stats_path=None, save_txt=False,
+                 save_xlsx=None, stream=False, fuzzy=0, correct_fuzzy=0, flag_manifest=None,
+                 layout_dir=None, **ocr_opts):
+    """
+    volumes (ocr_hukuk.load_manifest biçiminde) OCR'lanır ya da txt_paths okunur,
+    maddeler ayrıştırılıp düzeltilir ve eski sözlük (old_path) bunlarla işaretlenerek
+    out_path'e yazılır. Düzeltme listesini döndürür. flag_manifest: flag adımının artımlı
+    çalışma dosyası (flag.update_and_flag'in manifest_path'i).
+    layout_dir: OCR sayfa düzenleri oraya yazılır (önceden yazılmışsa okunur) ve maddeler
+    bunlardan ayrılır (layout_entries); volumes gerekir.
+    """
+    texts = []
+    if volumes:
+        texts = ocr_texts(volumes, layout_dir=layout_dir, **ocr_opts)
+        if save_txt:
+            for v, text in zip(volumes, texts):
+                with open(v["out"], "w", encoding="utf-8") as f:
+                    f.write(text)
+    for path in txt_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+
+    entries = layout_entries(volumes, layout_dir) if layout_dir else None
+    groups, changes = parse_texts(texts, correct=correct, sim_backend=sim_backend,
+                                   correct_fuzzy=correct_fuzzy, entries=entries)
+    print(f"📊 {sum(len(r) for r in groups.values())} madde, {len(groups)} harf; "
+          f"düzeltilen satır: {len(changes)}")
+    if save_xlsx:
+        write_letter_sheets(groups, save_xlsx)
+
+    new_data = {sheet_name_for(ch): rows for ch, rows in groups.items()}
+    flag.update_and_flag(old_path, None, out_path, sim_threshold=sim_threshold,
+                         sim_method=sim_method, new_data=new_data, stats_path=stats_path,
+                         stream=stream, fuzzy=fuzzy, manifest_path=flag_manifest)
+    return changes
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OCR → parse → correct → flag (tek süreç)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--manifest", help="ocr_hukuk manifest JSON (çok cilt)")
+    src.add_argument("--pdf", help="Tek PDF (--first/--last ile)")
+    src.add_argument("--txt", nargs="+", help="OCR yapmadan mevcut TXT çıktıları kullan")
+    ap.add_argument("--first", type=int, default=ocr_hukuk.FIRST_PAGE)
+    ap.add_argument("--last", type=int, default=ocr_hukuk.LAST_PAGE)
+    ap.add_argument("--harf", default="A", help="--pdf ile tek cilt için harf etiketi")
+    ap.add_argument("--old", required=True, help="İşaretlenecek eski sözlük (HukukSözlüğü.xlsx)")
+    ap.add_argument("--out", default="updated_flagged.xlsx")
+    ap.add_argument("--threshold", type=float, default=0.5)
+    ap.add_argument("--method", choices=SIM_METHODS, default="jaccard")
+    ap.add_argument("--stats", help="tf-idf korpus istatistikleri dosyası (.json.gz); yoksa oluşturulur")
+    ap.add_argument("--stream", action="store_true",
+                    help="Eski sözlüğü akışlı oku/yaz (büyük dosyalar için; biçimler korunmaz)")
+    ap.add_argument("--fuzzy", type=float, default=0, metavar="K",
+                    help="flag adımında düzenleme uzaklığı en çok K olan başlıkları da aday yap "
+                         "(Türkçe karışıklıklar 0.25 sayılır; varsayılan: kapalı)")
+    ap.add_argument("--flag-manifest", metavar="PATH",
+                    help="flag adımının artımlı çalışma dosyası (.json.gz): sadece değişen maddeler "
+                         "yeniden skorlanır")
+    ap.add_argument("--layout-dir",
+                    help="Maddeleri metin yerine sayfa düzeninden (kelime kutuları, girinti) ayır; "
+                         "düzen kayıtları (.json.gz) bu klasöre yazılır")
+    ap.add_argument("--no-correct", action="store_true", help="correct_excel adımını atla")
+    ap.add_argument("--sim-backend", choices=RATIO_BACKENDS, default=correct_excel.SIM_BACKEND,
+                    help="correct adımındaki tanım benzerliği motoru")
+    ap.add_argument("--correct-fuzzy", type=float, default=0, metavar="K",
+                    help="correct adımında son kelimesi birebir bulunmayan satıra uzaklığı en çok K "
+                         "olan son kelimeleri de aday yap (varsayılan: kapalı)")
+    ap.add_argument("--save-txt", action="store_true", help="OCR metinlerini manifestteki 'out' dosyalarına da yaz")
+    ap.add_argument("--save-xlsx", help="Düzeltilmiş yeni sözlüğü bu xlsx'e de yaz")
+    ap.add_argument("--dpi", type=int, default=ocr_hukuk.DPI)
+    ap.add_argument("--lang", default=ocr_hukuk.LANG)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--chunk", type=int, default=2)
+    ap.add_argument("--backend", choices=ocr_hukuk.BACKENDS, default="pytesseract")
+    ap.add_argument("--cache-dir", default=ocr_hukuk.CACHE_DIR)
+    ap.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+    if args.layout_dir and args.txt:
+        ap.error("--layout-dir, --manifest ya da --pdf ile kullanılır (OCR sayfa aralığı gerekir)")
+
+    volumes = None
+    if args.manifest:
+        volumes = ocr_hukuk.load_manifest(args.manifest)
+    elif args.pdf:
+        volumes = [{"harf": args.harf, "pdf": args.pdf, "first": args.first, "last": args.last,
+                    "out": ocr_hukuk.OUTPUT_TXT}]
+
+    run_pipeline(args.old, args.out, volumes=volumes, txt_paths=args.txt or (),
+                 correct=not args.no_correct, sim_backend=args.sim_backend,
+                 sim_threshold=args.threshold, sim_method=args.method,
+                 stats_path=args.stats, stream=args.stream, fuzzy=args.fuzzy,
+                 correct_fuzzy=args.correct_fuzzy, flag_manifest=args.flag_manifest,
+                 layout_dir=args.layout_dir,
+                 save_txt=args.save_txt, save_xlsx=args.save_xlsx,
+                 workers=args.workers, chunk=args.chunk, dpi=args.dpi, lang=args.lang,
+                 backend=args.backend, cache_dir=None if args.no_cache else args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Hukuk sözlüğü scriptlerinin ortak çekirdeği: Türkçe normalizasyon/tokenizasyon,
+harf sayfası seçimi, OCR metni ayrıştırma, benzerlik metotları, eşleştirme deposu ve
+Excel yardımcıları.
+"""
+from .normalize import (
+    TR_ALPHABET, ALPHA_INDEX, TR_UP_MAP, TR_DOWN_MAP,
+    tr_upper, tr_sort_key, first_letter_bucket, target_sheet, group_by_letter,
+    normalize_tr, norm_tr, tokenize_def, guess_pos,
+)
+from .parse import (
+    iter_entries, read_entries, clean_txt, looks_like_term_line,
+    parse_entries_with_prefix_merge,
+)
+from .similarity import (
+    SIM_METHODS, sim_overlap, sim_jaccard, sim_tfidf_cosine, TfidfIndex,
+    RATIO_BACKENDS, RatioSimilarity,
+)
+from .excel import (
+    NEEDED_HEADERS, find_col, read_new_words, ensure_headers, plan_headers, dictionary_columns,
+    iter_dictionary_rows, sheet_name_for, write_letter_sheets, write_table,
+)
+from .corpus import CorpusStats, corpus_stats, file_sha256
+from .fuzzy import DeletionIndex, deletes
+from .store import EntryStore
+from .lsh import MinHashLSH
+from .trie import TR_SUB_COST, HeadwordTrie, sub_cost, tr_edit_distance, tr_skeleton
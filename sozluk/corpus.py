@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Eski sözlüğün (HukukSözlüğü.xlsx) tanım korpusu istatistikleri.
+
+update_and_flag'in TF-IDF metodu için belge frekansları (df) ve belge sayısı
+çalışmanın başında, tüm sayfalar bir kez taranarak çıkarılır ve dondurulur;
+böylece IDF, sayfaların hangi sırayla işlendiğinden bağımsızdır. Tablo
+dosyaya yazılabilir; aynı çalışma kitabıyla tekrar çalışırken yeniden
+tokenize edilmez.
+"""
+import os
+import gzip
+import json
+import hashlib
+from array import array
+
+from .normalize import tokenize_def
+from .excel import iter_dictionary_rows
+
+STATS_VERSION = 1
+
+
+def file_sha256(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(block), b""):
+            h.update(buf)
+    return h.hexdigest()
+
+
+class CorpusStats:
+    """
+    Dondurulmuş belge frekansı tablosu.
+    tokens[i] ile df[i] aynı token'a aittir; ids token -> i eşlemesidir.
+    Belge = KELİME'si dolu ve tanımında en az bir token olan satır.
+    """
+
+    def __init__(self, tokens, df, doc_count, source=None):
+        self.tokens = tokens
+        self.df = df
+        self.doc_count = doc_count
+        self.source = source
+        self.ids = {tok: i for i, tok in enumerate(tokens)}
+
+    def get(self, tok, default=0):
+        i = self.ids.get(tok)
+        return default if i is None else self.df[i]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @classmethod
+    def from_workbook(cls, wb, source=None):
+        """Çalışma kitabındaki tüm sözlük sayfalarını (salt okunur) bir kez tarar."""
+        return cls.from_rows(iter_dictionary_rows(wb), source)
+
+    @classmethod
+    def from_rows(cls, rows, source=None):
+        """iter_dictionary_rows biçimindeki (sayfa, satır, kelime, tanım) satırlarından."""
+        counts = {}
+        doc_count = 0
+        for _, _, _, definition in rows:
+            tokens = tokenize_def(definition)
+            if not tokens:
+                continue
+            doc_count += 1
+            for tok in tokens:
+                counts[tok] = counts.get(tok, 0) + 1
+        tokens = sorted(counts)
+        return cls(tokens, array("I", (counts[t] for t in tokens)), doc_count, source)
+
+    def save(self, path):
+        """gzip'li JSON olarak atomik yazar."""
+        data = {"version": STATS_VERSION, "source": self.source, "doc_count": self.doc_count,
+                "tokens": self.tokens, "df": self.df.tolist()}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != STATS_VERSION:
+            return None
+        return cls(data["tokens"], array("I", data["df"]), data["doc_count"], data.get("source"))
+
+
+def corpus_stats(old_path, wb=None, cache_path=None):
+    """
+    old_path'in korpus istatistikleri. cache_path verilirse ve oradaki tablo aynı
+    dosya içeriğinden (sha256) üretilmişse okunur, değilse taranıp oraya yazılır.
+    wb: zaten açılmış çalışma kitabı (yoksa salt okunur açılır).
+    """
+    digest = file_sha256(old_path)
+    if cache_path and os.path.exists(cache_path):
+        stats = CorpusStats.load(cache_path)
+        if stats is not None and stats.source == digest:
+            return stats
+    if wb is None:
+        from openpyxl import load_workbook
+        wb = load_workbook(old_path, read_only=True, data_only=True)
+    stats = CorpusStats.from_workbook(wb, source=digest)
+    if cache_path:
+        stats.save(cache_path)
+    return stats
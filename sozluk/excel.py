@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Sözlük Excel dosyaları ve rapor tabloları için okuma/yazma yardımcıları."""
+import sys
+import csv
+import json
+
+from openpyxl import load_workbook
+
+from .normalize import TR_ALPHABET, tr_sort_key
+
+# find_col'un tanıdığı başlık eş adları
+HEADER_SYNONYMS = {
+    "DEFINITION": {"DEFINITION", "ANLAM"},
+    "KELİME": {"KELİME", "KELIME", "WORD"},
+    "POS": {"POS"},
+    "R": {"R"},
+    "ID": {"ID"},
+    "EXAMPLE SENTENCE": {"EXAMPLE SENTENCE", "EXAMPLE", "ÖRNEK"},
+}
+
+NEEDED_HEADERS = ["R", "KELİME", "ID", "POS", "DEFINITION", "EXAMPLE SENTENCE"]
+
+# Harf sayfası olmayan, okunurken atlanan sayfalar
+SKIP_SHEETS = {"özet", "toplam"}
+
+
+def _match_headers(rows, wanted, search_rows=10):
+    """find_col'un asıl işi: satırlarda başlıkları arar; (bulunanlar, taranan satır sayısı) döndürür."""
+    wanted_sets = {w: {w.lower()} | {x.lower() for x in HEADER_SYNONYMS.get(w, {w})} for w in wanted}
+    found = {w: None for w in wanted}
+
+    for i, row in enumerate(rows, start=1):
+        if i > search_rows:
+            break
+        if not row:
+            continue
+        for j, val in enumerate(row, start=1):
+            if val is None:
+                continue
+            key = str(val).strip().lower()
+            for w in wanted:
+                if found[w] is None and key in wanted_sets[w]:
+                    found[w] = j
+        if all(found.get(w) for w in wanted if w != "EXAMPLE SENTENCE"):
+            return found, i
+    return found, search_rows
+
+
+def find_col(ws, wanted, search_rows=10):
+    """
+    ws içinde istenen başlık adlarını bulup 1-bazlı kolon indekslerini döndürür.
+    'DEFINITION' yerine 'ANLAM' da gelebilir, bu yüzden eş adları destekliyoruz.
+    """
+    rows = ws.iter_rows(min_row=1, max_row=search_rows, values_only=True)
+    return _match_headers(rows, wanted, search_rows)[0]
+
+
+def read_new_words(new_path):
+    """Yeni sözlük xlsx'ini { sayfa: [(kelime, anlam), ...] } olarak okur."""
+    wb = load_workbook(new_path, read_only=True, data_only=True)
+    data = {}
+    for sh in wb.sheetnames:
+        if sh.lower() in SKIP_SHEETS:
+            continue
+        ws = wb[sh]
+        idx = find_col(ws, ["kelime", "anlam"])
+        kcol, acol = idx.get("kelime"), idx.get("anlam")
+        if not kcol:
+            continue
+        pairs = []
+        for r in ws.iter_rows(min_row=2, values_only=True):
+            if not r:
+                continue
+            k = r[kcol - 1] if len(r) >= kcol else None
+            a = r[acol - 1] if acol and len(r) >= acol else ""
+            if k:
+                pairs.append((k, a))
+        data[sh] = pairs
+    return data
+
+
+def ensure_headers(ws):
+    """Sayfada NEEDED_HEADERS başlıklarını garanti eder; { başlık: kolon } döndürür."""
+    if ws.max_row < 1:
+        ws.append(NEEDED_HEADERS)
+    header_row = 1
+    header_vals = [ws.cell(header_row, c).value for c in range(1, ws.max_column + 1)]
+    if not any(header_vals):
+        for i, name in enumerate(NEEDED_HEADERS, start=1):
+            ws.cell(header_row, i, name)
+
+    idx = find_col(ws, NEEDED_HEADERS)
+    colmap = {}
+    for name in NEEDED_HEADERS:
+        c = idx.get(name)
+        if not c:
+            c = ws.max_column + 1
+            ws.cell(1, c, name)
+        colmap[name] = c
+    return colmap
+
+
+def plan_headers(rows, width):
+    """
+    ensure_headers'ın sayfaya dokunmayan karşılığı (salt okunur / akışlı yazım için).
+    rows: sayfanın ilk satırları (en çok 10), width: kolon sayısı.
+    Döner: ({ başlık: kolon }, başlık satırına yazılacak { kolon: ad }, taranan satır sayısı).
+    Normal modda başlık araması taradığı satırları oluşturur (max_row en az o kadar olur);
+    aynı satır numaralarını vermek için bu sayı da döndürülür.
+    """
+    rows = [tuple(r) for r in rows]
+    first = list(rows[0]) if rows else []
+    writes = {}
+    if not any(first[:width]):
+        for i, name in enumerate(NEEDED_HEADERS, start=1):
+            writes[i] = name
+        first += [None] * (len(NEEDED_HEADERS) - len(first))
+        first[:len(NEEDED_HEADERS)] = NEEDED_HEADERS
+        width = max(width, len(NEEDED_HEADERS))
+    idx, scanned = _match_headers([tuple(first)] + rows[1:], NEEDED_HEADERS)
+
+    colmap = {}
+    for name in NEEDED_HEADERS:
+        c = idx.get(name)
+        if not c:
+            width += 1
+            c = width
+            writes[c] = name
+        colmap[name] = c
+    return colmap, writes, scanned
+
+
+def dictionary_columns(ws, names=("KELİME", "DEFINITION")):
+    """
+    ensure_headers'ın bu sayfada vereceği kolonları sayfayı değiştirmeden bulur
+    (salt okunur sayfalar için). Başlığı olmayan ad için None döner: ensure_headers
+    orada boş bir kolon açacağı için o kolonda veri yoktur.
+    """
+    header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    if not any(header):
+        return {n: NEEDED_HEADERS.index(n) + 1 for n in names}
+    return find_col(ws, list(names))
+
+
+def iter_dictionary_rows(wb):
+    """
+    Eski sözlük biçimindeki çalışma kitabının tüm harf sayfalarındaki maddeler:
+    (sayfa, satır, kelime, tanım). KELİME'si boş satırlar atlanır, tanımı olmayan
+    satırın tanımı "" gelir. Kolonlar dictionary_columns ile bulunur (salt okunur uygun).
+    """
+    for sh in wb.sheetnames:
+        if sh.lower() in SKIP_SHEETS:
+            continue
+        ws = wb[sh]
+        idx = dictionary_columns(ws)
+        kcol, dcol = idx.get("KELİME"), idx.get("DEFINITION")
+        if not kcol or not dcol:
+            continue
+        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+            if len(row) < kcol or not row[kcol - 1]:
+                continue
+            yield sh, row_idx, row[kcol - 1], row[dcol - 1] if dcol <= len(row) else ""
+
+
+def sheet_name_for(bucket):
+    return bucket if bucket != "#" else "Diger"
+
+
+def write_letter_sheets(groups, out_path, letters=None):
+    """
+    { harf: [(kelime, anlam), ...] } gruplarını Özet + harf başına bir sayfa olarak yazar.
+    Satırlar Türkçe alfabe sırasına göre (kararlı) sıralanır. letters verilirse
+    sadece o harfler yazılır.
+    """
+    import pandas as pd
+
+    order = [ch for ch in TR_ALPHABET + ["#"] if groups.get(ch) and (letters is None or ch in letters)]
+    with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
+        if order:
+            summary = pd.DataFrame([{"Harf": ch, "Kayıt Sayısı": len(groups[ch])} for ch in order],
+                                   columns=["Harf", "Kayıt Sayısı"])
+            summary.to_excel(writer, sheet_name="Özet", index=False)
+            ws_sum = writer.sheets["Özet"]
+            ws_sum.freeze_panes(1, 0)
+            ws_sum.set_column(0, 0, 8)
+            ws_sum.set_column(1, 1, 14)
+
+        for ch in order:
+            gdf = pd.DataFrame(list(groups[ch]), columns=["kelime", "anlam"])
+            gdf = gdf.sort_values(by="kelime", key=lambda s: s.map(tr_sort_key), kind="stable")
+            sheet_name = sheet_name_for(ch)
+            gdf.to_excel(writer, sheet_name=sheet_name, index=False)
+            ws = writer.sheets[sheet_name]
+            ws.freeze_panes(1, 0)
+            ws.set_column(0, 0, 28)  # kelime
+            ws.set_column(1, 1, 90)  # anlam
+
+
+def write_table(rows, columns, path=None, fmt=None):
+    """Satırları CSV ya da JSON yazar; fmt verilmezse uzantıdan, path yoksa stdout'a."""
+    if fmt is None:
+        fmt = "json" if str(path).lower().endswith(".json") else "csv"
+    f = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(rows, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        else:
+            w = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(rows)
+    finally:
+        if path:
+            f.close()
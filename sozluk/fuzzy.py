@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Bulanık aday anahtarları (SymSpell tarzı silme biçimleri) ve başlık silme indeksi.
+
+Düz Levenshtein uzaklığı en çok k olan her kelime çifti, en çok k karakter
+silinmiş biçimlerinden en az birini paylaşır (tersi her zaman doğru değildir);
+bu yüzden biçimler ikili karşılaştırma yerine kova anahtarı olarak kullanılabilir
+(dedupe.py, tr_skeleton'lı başlıklar üzerinde). DeletionIndex aynı biçimleri
+başlık araması için indeksler: bir sorgu, kelime uzunluğuna bağlı birkaç sözlük
+erişimi ve birkaç kısa doğrulamadır (önek ağacını dolaşmaktan çok daha hızlı).
+"""
+from .trie import tr_edit_distance, tr_skeleton
+
+
+def deletes(word, max_dist):
+    """word'den en çok max_dist karakter silinerek elde edilen biçimler (word dahil)."""
+    out = {word}
+    frontier = {word}
+    for _ in range(max_dist):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+class DeletionIndex:
+    """
+    Başlıklar için silme indeksi: { iskelet silme biçimi: [başlık, ...] }.
+    Başlıklar tr_skeleton'a indirilip en çok int(max_cost) silme biçimiyle indekslenir;
+    tr_edit_distance(a, b) ≤ max_cost olan her çiftin iskeletleri bir biçim paylaştığından
+    (bkz. tr_skeleton) aday kaçmaz. Adaylar Türkçe ağırlıklı uzaklıkla doğrulanır,
+    sonuç HeadwordTrie.search ile aynıdır.
+    """
+
+    def __init__(self, max_cost=1.0, words=()):
+        self.max_cost = max_cost
+        self.k = int(max_cost)
+        self.index = {}
+        self.words = set()
+        for w in words:
+            self.add(w)
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        if not word or word in self.words:
+            return
+        self.words.add(word)
+        index = self.index
+        for d in deletes(tr_skeleton(word), self.k):
+            index.setdefault(d, []).append(word)
+
+    def lookup(self, word, max_cost=None, include_self=False):
+        """
+        word'e uzaklığı en çok max_cost (en çok kurulumdaki max_cost) olan başlıklar:
+        [(başlık, uzaklık), ...] yakından uzağa, eşitlikte alfabetik.
+        """
+        cost = self.max_cost if max_cost is None else min(max_cost, self.max_cost)
+        index = self.index
+        seen = set()
+        out = []
+        for d in deletes(tr_skeleton(word), int(cost)):
+            for cand in index.get(d, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                if cand == word and not include_self:
+                    continue
+                dist = tr_edit_distance(word, cand, cost)
+                if dist <= cost:
+                    out.append((cand, dist))
+        out.sort(key=lambda x: (x[1], x[0]))
+        return out
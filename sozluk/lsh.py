@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Tanım token kümeleri (tokenize_def) üzerinde MinHash-LSH indeksi.
+
+Her kümenin num_perm bileşenli MinHash imzası bands gruba bölünür; aynı gruptaki
+bileşenleri birebir tutan kümeler aynı kovaya düşer. Jaccard benzerliği s olan iki
+kümenin en az bir kovayı paylaşma olasılığı 1 - (1 - s^r)^b (r = num_perm / bands);
+varsayılanlarla (32 / 8) s = 0.5'te ~%40, 0.7'de ~%90, 0.8'de ~%99. Sorgu, sayfa ya
+da başlıktan bağımsız olarak yalnız kovaları paylaşan tanımları aday yapar; adaylar
+gerçek Jaccard ile doğrulanır. Tüm sözlükle ikili karşılaştırma gerekmez.
+
+Token özetleri zlib.crc32 ile alınır (Python hash()'i süreçler arasında değişir),
+bu yüzden imzalar çalıştırmalar ve süreçler arasında aynıdır.
+"""
+import random
+import zlib
+
+from .normalize import tokenize_def
+
+_PRIME = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """
+    items[i]: i. kaydın çağıranın verdiği yükü (örn. (sayfa, satır, kelime, tanım))
+    sets[i]: i. kaydın token kümesi
+    buckets[b]: { b. grup imzası: kayıt ya da [kayıt, ...] }
+    """
+
+    def __init__(self, num_perm=32, bands=8, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm, bands'in katı olmalı")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rnd = random.Random(seed)
+        self._perms = [(rnd.randrange(1, _PRIME), rnd.randrange(_PRIME)) for _ in range(num_perm)]
+        self._tok = {}          # token -> num_perm'lik özet demeti (önbellek)
+        self.items = []
+        self.sets = []
+        self.buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.items)
+
+    def _token_hashes(self, tok):
+        h = self._tok.get(tok)
+        if h is None:
+            x = zlib.crc32(tok.encode("utf-8"))
+            h = self._tok[tok] = tuple((a * x + b) % _PRIME for a, b in self._perms)
+        return h
+
+    def signature(self, tokens):
+        """tokens'ın MinHash imzası (boş küme için None)."""
+        if not tokens:
+            return None
+        hashes = [self._token_hashes(t) for t in tokens]
+        if len(hashes) == 1:
+            return hashes[0]
+        return tuple(map(min, *hashes))
+
+    def band_keys(self, tokens):
+        """tokens'ın bands kova anahtarı (grup başına imza dilimi özeti; boş küme için None)."""
+        sig = self.signature(tokens)
+        if sig is None:
+            return None
+        r = self.rows
+        return [hash(sig[i:i + r]) for i in range(0, self.num_perm, r)]
+
+    def add(self, item, tokens):
+        """Kayıt ekler (tokens boşsa indekslenmez); kayıt numarasını ya da None döndürür."""
+        keys = self.band_keys(tokens)
+        if keys is None:
+            return None
+        k = len(self.items)
+        self.items.append(item)
+        self.sets.append(tokens)
+        for bucket, key in zip(self.buckets, keys):
+            cur = bucket.get(key)
+            if cur is None:
+                bucket[key] = k
+            elif cur.__class__ is int:
+                bucket[key] = [cur, k]
+            else:
+                cur.append(k)
+        return k
+
+    def candidates(self, tokens):
+        """tokens'la en az bir kovayı paylaşan kayıt numaraları."""
+        keys = self.band_keys(tokens)
+        if keys is None:
+            return set()
+        out = set()
+        for bucket, key in zip(self.buckets, keys):
+            cur = bucket.get(key)
+            if cur is None:
+                continue
+            if cur.__class__ is int:
+                out.add(cur)
+            else:
+                out.update(cur)
+        return out
+
+    def query(self, tokens, threshold=0.5):
+        """Jaccard'ı en az threshold olan kayıtlar: [(kayıt, jaccard), ...] benzerden aza."""
+        out = []
+        sets = self.sets
+        na = len(tokens)
+        for k in self.candidates(tokens):
+            inter = len(tokens & sets[k])
+            score = inter / (na + len(sets[k]) - inter)
+            if score >= threshold:
+                out.append((k, score))
+        out.sort(key=lambda x: (-x[1], x[0]))
+        return out
+
+    @classmethod
+    def from_rows(cls, rows, **params):
+        """
+        iter_dictionary_rows biçimindeki (sayfa, satır, kelime, tanım) satırlarından
+        indeks; yük satırın kendisidir.
+        """
+        index = cls(**params)
+        for row in rows:
+            index.add(row, tokenize_def(row[3]))
+        return index
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Türkçe metin yardımcıları: büyük/küçük harf, normalizasyon, tokenizasyon,
+harf sayfası (bucket) seçimi. Tablolar ve regex'ler modül yüklenirken bir kez
+derlenir; sık çağrılan normalizasyon/tokenizasyon fonksiyonları önbelleklidir.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+TR_LETTERS = "A-Za-zÇĞİIÖŞÜÂÎÛçğıiöşüâîû"
+
+# Türkçe büyük harfe çevirme (şapkalılar dâhil)
+TR_UP_MAP = str.maketrans({
+    "i": "İ", "ı": "I",
+    "ş": "Ş", "ğ": "Ğ", "ç": "Ç", "ö": "Ö", "ü": "Ü",
+    "â": "Â", "î": "Î", "û": "Û"
+})
+TR_DOWN_MAP = str.maketrans({"I": "ı", "İ": "i"})
+
+# normalize_tr: şapkalıları düz harfe indir + I/İ -> ı/i (tek translate ile)
+_FLAT_MAP = str.maketrans({
+    "Â": "A", "â": "a",
+    "Î": "i", "î": "i",
+    "Û": "U", "û": "u",
+    "I": "ı", "İ": "i",
+})
+
+# Türkçe alfabe (Q, W, X yok)
+TR_ALPHABET = list("A B C Ç D E F G Ğ H I İ J K L M N O Ö P R S Ş T U Ü V Y Z".split())
+ALPHA_INDEX = {ch: idx for idx, ch in enumerate(TR_ALPHABET)}
+
+# Şapkalı harfle başlayan kelimelerin gideceği sayfa
+CIRCUMFLEX_SHEET = {"Â": "A", "â": "A", "Î": "İ", "î": "İ", "Û": "U", "û": "U"}
+
+_WS = re.compile(r"\s+")
+_LEAD_JUNK = re.compile(rf"^[^{TR_LETTERS}]+")
+_DEF_TOKEN = re.compile(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû0-9]+")
+_POS_WORD = re.compile(r"[A-Za-zÇĞİIÖŞÜçğıiöşüÂâÎîÛû]+")
+
+
+def tr_upper(s: str) -> str:
+    return s.translate(TR_UP_MAP).upper()
+
+
+def tr_sort_key(word: str):
+    """Türkçe harf sırasına göre sıralama anahtarı."""
+    w = tr_upper(word)
+    return [ALPHA_INDEX.get(ch, 100 + ord(ch)) for ch in w]
+
+
+def first_letter_bucket(term: str) -> str:
+    """
+    Kelimenin ilk harfine göre doğru sayfayı/harfi belirle (Â→A, Î→İ, Û→U).
+    Baştaki tırnak, rakam, parantez vb. çöpleri atar; harf bulunamazsa "#".
+    """
+    if not term:
+        return "#"
+    t = _LEAD_JUNK.sub("", term.strip())
+    if not t:
+        return "#"
+    first = t[0]
+    if first in CIRCUMFLEX_SHEET:
+        return CIRCUMFLEX_SHEET[first]
+    first_up = tr_upper(first)
+    return first_up if first_up in ALPHA_INDEX else "#"
+
+
+def target_sheet(kelime, sheet):
+    """Yeni sözlükteki kelimenin eski sözlükte bakılacağı sayfa: şapkalılar yönlendirilir, diğerleri aynı sayfa."""
+    first = str(kelime).strip()[:1]
+    return CIRCUMFLEX_SHEET.get(first, sheet)
+
+
+@lru_cache(maxsize=1 << 17)
+def normalize_tr(s):
+    """Eşleştirme anahtarı: şapkalılar düz, I/İ Türkçe küçük, boşluklar tek, casefold."""
+    if s is None:
+        return ""
+    s = str(s).strip().translate(_FLAT_MAP)
+    return _WS.sub(" ", s).casefold()
+
+
+@lru_cache(maxsize=1 << 17)
+def norm_tr(s):
+    """correct_excel eşleştirme anahtarı: I/İ Türkçe küçük + NFKC + casefold (şapkalar korunur)."""
+    if s is None:
+        return ""
+    s = str(s).strip().translate(TR_DOWN_MAP)
+    s = unicodedata.normalize("NFKC", s)
+    return s.casefold()
+
+
+@lru_cache(maxsize=1 << 17)
+def tokenize_def(text):
+    """Tanımı kelime kümesine çevir (basit tokenizasyon). Önbellekli olduğu için frozenset döner."""
+    if not text:
+        return frozenset()
+    return frozenset(_DEF_TOKEN.findall(str(text).lower()))
+
+
+def guess_pos(defn) -> str:
+    """Tanım sonundaki son kelime -mak/-mek ise VERB, aksi halde NOUN."""
+    if not defn:
+        return "NOUN"
+    words = _POS_WORD.findall(str(defn).strip().lower())
+    if words and (words[-1].endswith("mak") or words[-1].endswith("mek")):
+        return "VERB"
+    return "NOUN"
+
+
+def group_by_letter(entries):
+    """(kelime, anlam) çiftlerini first_letter_bucket'a göre { harf: [...] } olarak gruplar (sıra korunur)."""
+    groups = {}
+    for kelime, anlam in entries:
+        groups.setdefault(first_letter_bucket(kelime), []).append((kelime, anlam))
+    return groups
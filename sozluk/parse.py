@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+OCR metninden "kelime — anlam" maddelerini çıkaran ayrıştırıcılar.
+
+iter_entries: satır satır akan, doğrusal zamanlı ayrıştırıcı (pytesseract scriptleri).
+parse_entries_with_prefix_merge: clean_txt ile temizlenmiş metinde, bir önceki
+satıra taşmış terim öneklerini birleştiren ayrıştırıcı (correct_excel).
+"""
+import re
+import unicodedata
+
+from .normalize import TR_LETTERS
+
+# ---------- akış halinde ayrıştırma ----------
+# Kurallar:
+#  - sayfa başlıkları ve yumuşak tire silinir, 'za-\nyıf' -> 'zayıf'
+#  - "… —" içeren (ya da alt satırı "—" ile başlayan) satır yeni mantıksal satır başlatır,
+#    diğer satırlar önceki satıra boşlukla eklenir
+#  - "kelime — anlam" biçimine uymayan mantıksal satırlar önceki maddenin anlamına eklenir
+PAGE_HEADER = re.compile(r"^\s*---\s*Sayfa\s*\d+\s*---\s*$")
+HYPHEN_END = re.compile(r"\w-$")
+WORD_START = re.compile(r"\w")
+ENTRY_START = re.compile(r"\s*[^\n—]+?\s—")
+ENTRY = re.compile(r"\s*([^\n—]+?)\s—\s(.*)", re.DOTALL)
+MULTI_WS = re.compile(r"\s{2,}")
+SPACE_PUNCT = re.compile(r"\s+([,.;:!?])")
+
+
+def iter_physical_lines(f):
+    """NFC + sayfa başlığı/yumuşak tire temizliği + satır sonu tirelerini birleştirme."""
+    pending = None
+    for raw in f:
+        line = unicodedata.normalize("NFC", raw.rstrip("\r\n"))
+        if PAGE_HEADER.match(line):
+            line = ""
+        line = line.replace("\u00ad", "")
+        if pending is not None and HYPHEN_END.search(pending) and WORD_START.match(line):
+            pending = pending[:-1] + line          # 'za-' + 'yıf' -> 'zayıf'
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+
+def iter_logical_lines(lines):
+    """Fiziksel satırları madde başlarında bölünmüş mantıksal satırlara birleştirir."""
+    buf = []
+    prev = None
+    for line in lines:
+        if prev is not None and prev.strip():
+            starts = ENTRY_START.match(prev) or ("—" not in prev and line.startswith("—"))
+            if starts and buf:
+                yield MULTI_WS.sub(" ", " ".join(buf)).strip()
+                buf = []
+            buf.append(prev)
+        prev = line
+    if prev is not None and prev.strip():
+        if ENTRY_START.match(prev) and buf:
+            yield MULTI_WS.sub(" ", " ".join(buf)).strip()
+            buf = []
+        buf.append(prev)
+    if buf:
+        yield MULTI_WS.sub(" ", " ".join(buf)).strip()
+
+
+def iter_entries(f):
+    """
+    Satır üreten herhangi bir kaynaktan (açık dosya, satır listesi) (kelime, anlam)
+    çiftlerini sırayla üretir.
+    """
+    cur = None
+    prev = None
+    for line in iter_logical_lines(iter_physical_lines(f)):
+        if prev is not None:
+            # satır sonu da boşluk sayılır: "kelime —" satırının anlamı alt satırdan başlar
+            cur = yield from _step(cur, prev + "\n")
+        prev = line
+    if prev is not None:
+        cur = yield from _step(cur, prev)
+    if cur is not None:
+        yield from _finish(cur)
+
+
+def _step(cur, line):
+    m = ENTRY.match(line)
+    if m:
+        if cur is not None:
+            yield from _finish(cur)
+        return m.group(1), [m.group(2).rstrip("\n")]
+    if cur is not None:
+        cur[1].append(line.rstrip("\n"))
+    return cur
+
+
+def _finish(cur):
+    term = MULTI_WS.sub(" ", cur[0].strip())
+    definition = MULTI_WS.sub(" ", "\n".join(cur[1]).strip())
+    definition = SPACE_PUNCT.sub(r"\1", definition)
+    if term and definition:
+        yield term, definition
+
+
+def read_entries(path, encoding="utf-8"):
+    """TXT dosyasındaki maddeleri liste olarak döndürür."""
+    with open(path, "r", encoding=encoding) as f:
+        return list(iter_entries(f))
+
+
+# ---------- önek birleştirmeli ayrıştırma ----------
+HEAD = re.compile(r"^(?P<term>[^\n:—]{1,200}?)\s(?:—|:)\s(?P<def>.*)$")
+
+_CLEAN_STEPS = [
+    (re.compile(r"(?mi)^\s*---\s*Sayfa\s*\d+\s*---\s*$"), ""),
+    (re.compile(r"(?mi)^\s*(sayfa\s*)?\d+\s*$"), ""),
+]
+_CLEAN_HYPHEN = re.compile(r"(\w)-\n(\w)")
+_CLEAN_DASHES = [
+    (re.compile(r"\s+\-\s+"), " — "),
+    (re.compile(r"\s+—\s+"), " — "),
+    (re.compile(r"[ \t]+\n"), "\n"),
+    (re.compile(r"\n{3,}"), "\n\n"),
+    (re.compile(r"[ \t]{2,}"), " "),
+]
+_NON_TERM_CHAR = re.compile(rf"[^{TR_LETTERS}\s]")
+_TERM_CHAR = re.compile(rf"[{TR_LETTERS}]")
+_ONLY_PUNCT = re.compile(r"[^\wÇĞİIÖŞÜÂÎÛçğıiöşüâîû]+")
+
+
+def clean_txt(text: str) -> str:
+    t = unicodedata.normalize("NFC", text)
+    for pat, rep in _CLEAN_STEPS:
+        t = pat.sub(rep, t)
+    t = t.replace("\u00ad", "")
+    t = _CLEAN_HYPHEN.sub(r"\1\2", t)
+    t = t.replace("–", "—").replace("−", "-")
+    for pat, rep in _CLEAN_DASHES:
+        t = pat.sub(rep, t)
+    return t
+
+
+def looks_like_term_line(line: str) -> bool:
+    if not line: return False
+    if "—" in line or ":" in line: return False
+    if len(line) > 80: return False
+    if _NON_TERM_CHAR.search(line): return False
+    return bool(_TERM_CHAR.search(line))
+
+
+def parse_entries_with_prefix_merge(text: str):
+    entries = []
+    term_prefix_buf, cur_term, cur_def_parts = [], None, []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if cur_term and cur_def_parts and cur_def_parts[-1] != "":
+                cur_def_parts.append("")
+            continue
+        m = HEAD.match(line)
+        if m and not _ONLY_PUNCT.fullmatch(m.group("term").strip()):
+            if cur_term is not None:
+                entries.append((cur_term, " ".join(p for p in cur_def_parts if p != "")))
+                cur_term, cur_def_parts = None, []
+            term_core = MULTI_WS.sub(" ", m.group("term").strip())
+            if term_prefix_buf:
+                prefix = " ".join(tp.strip() for tp in term_prefix_buf if tp.strip())
+                full_term = (prefix + " " + term_core).strip()
+            else:
+                full_term = term_core
+            cur_term = full_term
+            cur_def_parts = [m.group("def").strip()]
+            term_prefix_buf = []
+            continue
+        if cur_term is None:
+            if looks_like_term_line(line): term_prefix_buf.append(line)
+            else: term_prefix_buf = []
+        else:
+            cur_def_parts.append(line)
+    if cur_term is not None:
+        entries.append((cur_term, " ".join(p for p in cur_def_parts if p != "")))
+
+    cleaned = []
+    for term, defi in entries:
+        term = MULTI_WS.sub(" ", term).strip(" -–—:.;, \t")
+        defi = MULTI_WS.sub(" ", defi)
+        defi = SPACE_PUNCT.sub(r"\1", defi).strip()
+        cleaned.append((term, defi))
+    return cleaned
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Tanımlar arasındaki benzerlik metotları:
+  - kümeler (tokenize_def çıktısı) üzerinde overlap / jaccard / tf-idf cosine,
+  - düz metin üzerinde SequenceMatcher oranı (RatioSimilarity).
+"""
+import math
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio    # opsiyonel: C hızında Indel oranı
+except ImportError:
+    _rf_ratio = None
+
+
+def sim_overlap(new_tokens, old_tokens):
+    """|A∩B| / |A|  (A = yeni tanım)"""
+    if not new_tokens:
+        return 0.0
+    return len(new_tokens & old_tokens) / len(new_tokens)
+
+
+def sim_jaccard(tokens_a, tokens_b):
+    """|A∩B| / |A∪B|"""
+    if not tokens_a and not tokens_b:
+        return 0.0
+    inter = len(tokens_a & tokens_b)
+    union = len(tokens_a | tokens_b)
+    if union == 0:
+        return 0.0
+    return inter / union
+
+
+def sim_tfidf_cosine(tokens_a, tokens_b, df_counter, doc_count):
+    """
+    Basit TF-IDF + cosine:
+    - tf = 1 (sadece var/yok)
+    - idf = log((N+1)/(df+1)) + 1
+    """
+    if not tokens_a or not tokens_b or doc_count == 0:
+        return 0.0
+
+    vocab = tokens_a | tokens_b
+    num = 0.0
+    sum_a = 0.0
+    sum_b = 0.0
+
+    for t in vocab:
+        df = df_counter.get(t, 0)
+        idf = math.log((doc_count + 1) / (df + 1)) + 1.0
+        wa = idf if t in tokens_a else 0.0
+        wb = idf if t in tokens_b else 0.0
+        num += wa * wb
+        sum_a += wa * wa
+        sum_b += wb * wb
+
+    denom = (sum_a ** 0.5) * (sum_b ** 0.5)
+    if denom == 0.0:
+        return 0.0
+    return num / denom
+
+
+def _idf2(doc_count, df):
+    idf = math.log((doc_count + 1) / (df + 1)) + 1.0
+    return idf * idf
+
+
+class TfidfIndex:
+    """
+    sim_tfidf_cosine'in önceden hesaplanan hâli.
+
+    tf ikili olduğundan cosine = Σ_{t∈A∩B} idf(t)² / (|A|·|B|). Her token'a bir kez
+    kimlik verilir (vocab), idf² değerleri array('d') içinde tutulur ve her eski
+    tanımın vektör uzunluğu bir kez hesaplanıp kayıtta saklanır; bir skor için
+    sadece küme kesişimi (C hızında) ve kesişimdeki idf² toplamı kalır.
+    df ve doküman sayısı dondurulmuş korpus istatistiklerinden (CorpusStats) gelir;
+    IDF hiç değişmediğinden saklanan uzunluklar da geçerliliğini korur. Toplamlar math.fsum ile
+    alınır: sonuç küme sırasından bağımsızdır, aynı tanımlı adaylar eşit skor alır.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.doc_count = n = stats.doc_count
+        self.vocab = dict(stats.ids)
+        self.idf2 = array("d", (_idf2(n, df) for df in stats.df))
+
+    @classmethod
+    def from_stats(cls, stats):
+        """Dondurulmuş korpus istatistiklerinden (CorpusStats) kurar."""
+        return cls(stats)
+
+    def _idf2(self, tok):
+        return _idf2(self.doc_count, self.stats.get(tok, 0))
+
+    def add_tokens(self, tokens):
+        """Sözlükte olmayan token'lara kimlik verir."""
+        vocab = self.vocab
+        for tok in tokens:
+            if tok not in vocab:
+                vocab[tok] = len(self.idf2)
+                self.idf2.append(self._idf2(tok))
+
+    def weights(self, tokens):
+        """tokens sırasıyla idf² değerleri (array('d')); sözlükte olmayanlara kimlik verilir."""
+        self.add_tokens(tokens)
+        vocab, idf2 = self.vocab, self.idf2
+        return array("d", (idf2[vocab[tok]] for tok in tokens))
+
+    def norm(self, tokens):
+        """Token kümesinin TF-IDF vektör uzunluğu."""
+        try:
+            return math.sqrt(math.fsum(map(self.idf2.__getitem__, map(self.vocab.__getitem__, tokens))))
+        except KeyError:
+            self.add_tokens(tokens)
+            return self.norm(tokens)
+
+    def entry_norm(self, entry):
+        """entry["tokens"] için saklanan uzunluk (ilk istekte hesaplanır)."""
+        norm = entry.get("tfidf_norm")
+        if norm is None:
+            norm = entry["tfidf_norm"] = self.norm(entry["tokens"])
+        return norm
+
+    def cosine(self, tokens_a, tokens_b):
+        """İki token kümesinin cosine skoru (sim_tfidf_cosine ile aynı değer)."""
+        if not tokens_a or not tokens_b or self.doc_count == 0:
+            return 0.0
+        common = tokens_a & tokens_b
+        if not common:
+            return 0.0
+        idf2, vocab = self.idf2, self.vocab
+        num = math.fsum(map(idf2.__getitem__, map(vocab.__getitem__, common)))
+        return num / (self.norm(tokens_a) * self.norm(tokens_b))
+
+    def scores(self, new_tokens, entries):
+        """Yeni tanımın her eski kayda göre cosine skoru (sim_tfidf_cosine ile aynı değerler)."""
+        if not new_tokens or self.doc_count == 0:
+            return [0.0] * len(entries)
+        na = self.norm(new_tokens)
+        idf2, vocab = self.idf2, self.vocab
+        out = []
+        for entry in entries:
+            common = new_tokens & entry["tokens"]
+            if not common:
+                out.append(0.0)
+                continue
+            num = math.fsum(map(idf2.__getitem__, map(vocab.__getitem__, common)))
+            out.append(num / (na * self.entry_norm(entry)))
+        return out
+
+
+SIM_METHODS = ("overlap", "jaccard", "tfidf")
+
+
+# ---------- metin oranı (correct_excel) ----------
+RATIO_BACKENDS = ("difflib", "rapidfuzz")
+
+
+@lru_cache(maxsize=1 << 16)
+def _char_counts(s):
+    return Counter(s)
+
+
+class RatioSimilarity:
+    """
+    similarity(a, b): küçük harfe çevrilmiş, kırpılmış iki tanımın benzerlik oranı (0-1).
+
+    - Sonuçlar (a, b) çifti için saklanır; aynı çift ikinci kez hesaplanmaz.
+    - upper_bound: karakter çoklu kümesi kesişiminden ucuz üst sınır (uzunluk
+      sınırını da kapsar, SequenceMatcher.quick_ratio ile aynı); best() bu sınırla
+      mevcut en iyiyi geçemeyecek adayları pahalı orana hiç sokmaz.
+    - backend="rapidfuzz": aynı 2*M/(|a|+|b|) biçiminde, en uzun ortak alt diziye
+      dayalı C oranı. difflib'in blok sezgiselinden biraz yüksek çıkabilir; eşik
+      anlamı (oran >= eşik) aynıdır.
+    """
+
+    def __init__(self, backend="difflib"):
+        if backend not in RATIO_BACKENDS:
+            raise ValueError(f"bilinmeyen benzerlik motoru: {backend}")
+        if backend == "rapidfuzz" and _rf_ratio is None:
+            raise ImportError("rapidfuzz kurulu değil (pip install rapidfuzz)")
+        self.backend = backend
+        self.memo = {}
+
+    @staticmethod
+    def prep(s):
+        return (s or "").strip().lower()
+
+    def _ratio(self, a, b):
+        if not a and not b: return 1.0
+        if not a or not b: return 0.0
+        if self.backend == "rapidfuzz":
+            return _rf_ratio(a, b) / 100.0
+        return SequenceMatcher(None, a, b).ratio()
+
+    def __call__(self, a, b):
+        a, b = self.prep(a), self.prep(b)
+        key = (a, b)
+        r = self.memo.get(key)
+        if r is None:
+            r = self.memo[key] = self._ratio(a, b)
+        return r
+
+    def upper_bound(self, a, b):
+        """Oranın aşamayacağı değer; hesaplanmışsa kesin oran."""
+        a, b = self.prep(a), self.prep(b)
+        r = self.memo.get((a, b))
+        if r is not None:
+            return r
+        if not a and not b: return 1.0
+        if not a or not b: return 0.0
+        ca, cb = _char_counts(a), _char_counts(b)
+        if len(ca) > len(cb):
+            ca, cb = cb, ca
+        inter = sum(min(n, cb[ch]) for ch, n in ca.items())
+        # 1e-9: motorların kayan nokta yuvarlaması sınırı aşmasın
+        return 2.0 * inter / (len(a) + len(b)) + 1e-9
+
+    def best(self, a, items, text=lambda it: it, bonus=None):
+        """
+        max(items, key=lambda it: self(a, text(it)) + bonus(it)) ile aynı sonucu
+        (eşitlikte ilk aday) verir; (öğe, skor) döndürür.
+        """
+        best_item, best_score = None, None
+        for it in items:
+            extra = bonus(it) if bonus else 0.0
+            if best_item is not None and self.upper_bound(a, text(it)) + extra <= best_score:
+                continue
+            score = self(a, text(it)) + extra
+            if best_item is None or score > best_score:
+                best_item, best_score = it, score
+        return best_item, best_score
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Eski sözlük kayıtları için sütunlu depo (flag.py'nin eşleştirme indeksi).
+
+Her satır için ayrı bir sözlük ve token kümesi tutmak yerine kayıtlar sütunlarda
+durur: token'lar bir kez kimlik alır (interning), her kaydın sıralı token
+kimlikleri tek bir array('I') içinde art arda saklanır (sınırlar off'ta), satır
+numaraları array('I'), tanımlar referans olarak bir listede. overlap / jaccard /
+tf-idf skorları doğrudan bu kimlik dizileri üzerinde hesaplanır; skorlanan
+(çok adaylı gruplardaki) kayıtların kimlik kümesi ilk kullanımda saklanır, aynı
+gruba gelen sonraki kelimeler kesişimi iki küme arasında alır. Bulanık aday
+araması başlıkların Türkçe iskeletleri üzerinde silme indeksiyle (fuzzy.DeletionIndex)
+yapılır; adaylar karışıklıkları ucuz sayan uzaklıkla doğrulanır.
+"""
+import math
+from array import array
+
+from .fuzzy import DeletionIndex
+
+
+class EntryStore:
+    """
+    keys: { norm: [kayıt, ...] } (kayıt = eklenme sırası, 0-bazlı)
+    rows[k], defs[k]: k. kaydın satır numarası ve tanımı
+    tok[off[k]:off[k + 1]]: k. kaydın sıralı token kimlikleri
+    vocab / tokens: token <-> kimlik
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.rows = array("I")
+        self.defs = []
+        self.tok = array("I")
+        self.off = array("I", [0])
+        self.vocab = {}
+        self.tokens = []
+        self._w = array("d")        # tf-idf: kimlik -> idf²
+        self._w_index = None        # _w'nin kurulduğu TfidfIndex (id değil nesne: id'ler yeniden kullanılabilir)
+        self._norms = array("d")    # tf-idf: kayıt -> vektör uzunluğu (NaN = hesaplanmadı)
+        self._sets = {}             # skorlanmış kayıt -> kimlik kümesi
+        self._fuzzy = None          # başlıklar üzerinde silme indeksi (near ilk çağrıldığında)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, norm):
+        """norm'a ait kayıtlar (yoksa None)."""
+        return self.keys.get(norm)
+
+    def add(self, norm, row, definition, tokens):
+        """Kayıt ekler; tokens tokenize_def çıktısıdır. Kayıt numarasını döndürür."""
+        vocab = self.vocab
+        try:
+            ids = sorted(map(vocab.__getitem__, tokens))
+        except KeyError:
+            for t in tokens:
+                if t not in vocab:
+                    vocab[t] = len(self.tokens)
+                    self.tokens.append(t)
+            ids = sorted(map(vocab.__getitem__, tokens))
+        k = len(self.rows)
+        self.rows.append(row)
+        self.defs.append(definition)
+        self.tok.extend(ids)
+        self.off.append(len(self.tok))
+        ks = self.keys.get(norm)
+        if ks is None:
+            ks = self.keys[norm] = []
+            if self._fuzzy is not None:
+                self._fuzzy.add(norm)
+        ks.append(k)
+        return k
+
+    def token_ids(self, k):
+        return self.tok[self.off[k]:self.off[k + 1]]
+
+    def id_set(self, k):
+        """k. kaydın kimlik kümesi (ilk istekte diziden kurulur, sonra saklanır)."""
+        s = self._sets.get(k)
+        if s is None:
+            s = self._sets[k] = frozenset(self.tok[self.off[k]:self.off[k + 1]])
+        return s
+
+    def near(self, norm, max_cost):
+        """
+        norm'a Türkçe ağırlıklı düzenleme uzaklığı (trie.tr_edit_distance) en çok max_cost
+        olan diğer başlıkların kayıtları (yakın başlıklar önce). Silme indeksi ilk çağrıda
+        (ya da daha büyük bir max_cost istendiğinde) kurulur, add ile güncel kalır.
+        """
+        if self._fuzzy is None or self._fuzzy.max_cost < max_cost:
+            self._fuzzy = DeletionIndex(max_cost, self.keys)
+        out = []
+        for word, _ in self._fuzzy.lookup(norm, max_cost):
+            out.extend(self.keys[word])
+        return out
+
+    def lookup(self, tokens):
+        """Token kümesinin depoda bilinen kimlikleri; bilinmeyen token hiçbir kayıtla kesişmez."""
+        vocab = self.vocab
+        return frozenset(vocab[t] for t in tokens if t in vocab)
+
+    def scores(self, sim_method, new_tokens, entries, tfidf=None):
+        """
+        Yeni tanımın (token kümesi) verilen kayıtlara skorları; sim_overlap, sim_jaccard
+        ve TfidfIndex.scores ile aynı değerler.
+        """
+        if sim_method == "tfidf":
+            return self._tfidf_scores(new_tokens, entries, tfidf)
+        na = len(new_tokens)
+        ids = self.lookup(new_tokens)
+        tok, off, sets = self.tok, self.off, self._sets
+        out = []
+        for k in entries:
+            seg = sets.get(k)
+            if seg is None:
+                seg = sets[k] = frozenset(tok[off[k]:off[k + 1]])
+            inter = len(ids & seg)
+            if sim_method == "jaccard":
+                union = na + len(seg) - inter
+                out.append(inter / union if union else 0.0)
+            else:
+                out.append(inter / na if na else 0.0)
+        return out
+
+    def _weights(self, tfidf):
+        """Kimlik sırasıyla idf² dizisi; başka bir indeks verilirse baştan kurulur."""
+        if self._w_index is not tfidf:
+            self._w_index = tfidf
+            self._w = tfidf.weights(self.tokens)
+            self._norms = array("d", [math.nan]) * len(self.rows)
+        elif len(self._w) < len(self.tokens):
+            self._w.extend(tfidf.weights(self.tokens[len(self._w):]))
+        if len(self._norms) < len(self.rows):
+            self._norms.extend([math.nan] * (len(self.rows) - len(self._norms)))
+        return self._w
+
+    def _tfidf_scores(self, new_tokens, entries, tfidf):
+        if not new_tokens or tfidf.doc_count == 0:
+            return [0.0] * len(entries)
+        na = tfidf.norm(new_tokens)
+        w = self._weights(tfidf)
+        ids = self.lookup(new_tokens)
+        norms, id_set = self._norms, self.id_set
+        out = []
+        for k in entries:
+            seg = id_set(k)
+            common = ids & seg
+            if not common:
+                out.append(0.0)
+                continue
+            nb = norms[k]
+            if nb != nb:    # NaN: ilk kullanım
+                nb = norms[k] = math.sqrt(math.fsum(map(w.__getitem__, seg)))
+            out.append(math.fsum(map(w.__getitem__, common)) / (na * nb))
+        return out
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Başlık kelimeleri için önek ağacı (trie) ve Türkçe OCR karışıklıklarını ucuz sayan
+düzenleme uzaklığı.
+
+OCR'de ı/i, ş/s, ğ/g, ç/c, ö/o, ü/u ve şapkalı/düz ünlüler sık karışır; bunların
+birbirine dönüşmesi TR_SUB_COST, diğer ekleme / silme / değiştirmeler 1 sayılır.
+Bulanık sorgu ağacı bir kez dolaşır: her düğümde sorguya göre bir DP satırı
+hesaplanır, satırın en küçüğü sınırı aşan dallara inilmez.
+
+Ağaç diske yazılmaz: kaynak satırlardan yeniden kurmak, kaydedilmiş hâlini
+okumaktan hızlıdır.
+"""
+import heapq
+
+TR_SUB_COST = 0.25
+TR_CONFUSIONS = ("ıi", "şs", "ğg", "çc", "öo", "üu", "âa", "îi", "îı", "ûu")
+_CHEAP = {}
+for _a, _b in TR_CONFUSIONS:
+    for _x, _y in ((_a, _b), (_b, _a), (_a.upper(), _b.upper()), (_b.upper(), _a.upper())):
+        _CHEAP.setdefault(_x, set()).add(_y)
+# I/İ büyük harfte ters eşlenir (I ↔ ı, İ ↔ i); "ıi" çifti büyük harfte de ucuz kalsın
+_CHEAP.setdefault("I", set()).add("İ")
+_CHEAP.setdefault("İ", set()).add("I")
+del _a, _b, _x, _y
+
+# tr_skeleton: TR_CONFUSIONS'taki harfler çiftin düz harfine iner
+_SKELETON = str.maketrans("ışğçöüâîû", "isgcouaiu")
+
+_VALUES = ""    # düğümde kayıtların tutulduğu anahtar (karakter anahtarları tek harflidir)
+
+
+def sub_cost(a, b):
+    """a → b değiştirme maliyeti: aynıysa 0, Türkçe karışık çiftse TR_SUB_COST, değilse 1."""
+    if a == b:
+        return 0.0
+    return TR_SUB_COST if b in _CHEAP.get(a, ()) else 1.0
+
+
+def tr_edit_distance(a, b, max_cost=None):
+    """
+    Ağırlıklı Levenshtein uzaklığı (ekleme / silme = 1, değiştirme = sub_cost).
+    max_cost verilirse ve uzaklık onu aşıyorsa erken çıkılır, dönen değer > max_cost olur.
+    """
+    if a == b:
+        return 0.0
+    if max_cost is None:
+        prev = [float(i) for i in range(len(a) + 1)]
+        for cb in b:
+            prev = _dp_row(prev, a, cb)
+        return prev[-1]
+
+    # sınırlı: köşegenden int(max_cost)'tan uzak hücreler en az o kadar ekleme/silme ister
+    k = int(max_cost)
+    n = len(a)
+    if abs(len(b) - n) > k:
+        return float(abs(len(b) - n))
+    out = max_cost + 1.0
+    prev = [float(i) if i <= k else out for i in range(n + 1)]
+    for j, cb in enumerate(b, start=1):
+        cheap = _CHEAP.get(cb, ())
+        lo, hi = max(1, j - k), min(n, j + k)
+        cur = [out] * (n + 1)
+        if j <= k:
+            cur[0] = float(j)
+        best = cur[lo - 1]
+        for i in range(lo, hi + 1):
+            c = a[i - 1]
+            d = prev[i - 1]
+            if c != cb:
+                d += TR_SUB_COST if c in cheap else 1.0
+            if prev[i] + 1.0 < d:
+                d = prev[i] + 1.0
+            if cur[i - 1] + 1.0 < d:
+                d = cur[i - 1] + 1.0
+            cur[i] = d
+            if d < best:
+                best = d
+        if best > max_cost:
+            return best
+        prev = cur
+    return prev[n]
+
+
+def _dp_row(prev, word, ch):
+    """Ağırlıklı Levenshtein DP'sinin bir satırı: prev (word'e göre) + ch harfi."""
+    cheap = _CHEAP.get(ch, ())
+    left = prev[0] + 1.0
+    row = [left]
+    for i, c in enumerate(word):
+        d = prev[i]
+        if c != ch:
+            d += TR_SUB_COST if c in cheap else 1.0
+        up = prev[i + 1] + 1.0
+        if up < d:
+            d = up
+        if left + 1.0 < d:
+            d = left + 1.0
+        row.append(d)
+        left = d
+    return row
+
+
+def tr_skeleton(s):
+    """
+    Küçük harfli anahtarın iskeleti: birbirine TR_SUB_COST'la dönüşen harfler aynı harf
+    olur. tr_edit_distance(a, b) ≤ k ise iskeletlerin düz Levenshtein uzaklığı ≤ int(k)
+    (ucuz değiştirmeler iskelette eşleşmedir); bu yüzden iskeletler üzerinde tam sayılı
+    bir aday anahtarı (örn. fuzzy.deletes) hiçbir eşleşmeyi kaçırmaz.
+    """
+    return s.translate(_SKELETON)
+
+
+class HeadwordTrie:
+    """
+    Anahtar → [değer, ...] önek ağacı. Düğümler iç içe sözlüklerdir ({harf: alt düğüm}),
+    anahtara ait değerler düğümün "" girdisinde durur.
+    Anahtar normalizasyonu çağırana aittir (correct_excel norm_tr kullanır).
+    """
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self._node(key) is not None
+
+    def _node(self, key):
+        """key'in kayıtlı düğümü (anahtar yoksa None)."""
+        node = self.root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node if _VALUES in node else None
+
+    def add(self, key, value):
+        node = self.root
+        for ch in key:
+            nxt = node.get(ch)
+            if nxt is None:
+                nxt = node[ch] = {}
+            node = nxt
+        values = node.get(_VALUES)
+        if values is None:
+            values = node[_VALUES] = []
+            self.size += 1
+        values.append(value)
+
+    def get(self, key, default=None):
+        """key'e ait değerler (eklenme sırasıyla) ya da default."""
+        node = self._node(key)
+        return default if node is None else node[_VALUES]
+
+    def prefix(self, prefix):
+        """prefix ile başlayan (key, değerler) çiftleri, harf sırasıyla."""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return
+        stack = [(prefix, node)]
+        while stack:
+            key, node = stack.pop()
+            if _VALUES in node:
+                yield key, node[_VALUES]
+            for ch in sorted((c for c in node if c != _VALUES), reverse=True):
+                stack.append((key + ch, node[ch]))
+
+    def search(self, word, max_cost):
+        """word'e uzaklığı en çok max_cost olan anahtarlar: [(key, uzaklık), ...] yakından uzağa."""
+        out = []
+        first = [float(i) for i in range(len(word) + 1)]
+        if _VALUES in self.root and first[-1] <= max_cost:
+            out.append(("", first[-1]))
+        self._walk(self.root, "", word, first, lambda: max_cost, out.append)
+        out.sort(key=lambda x: (x[1], x[0]))
+        return out
+
+    def nearest(self, word, k=1, max_cost=None):
+        """
+        word'e en yakın k anahtar: [(key, uzaklık), ...]. Dolaşma sırasında o ana kadarki
+        k. en iyi uzaklık sınır olur; sınırı aşan dallar budanır. Eşit uzaklıkta alfabetik.
+        """
+        if k <= 0:
+            return []
+        best = []      # (-uzaklık, _Rev(key)): yığının başı o ana kadarki en kötü aday
+        limit = [float("inf") if max_cost is None else max_cost]
+
+        def bound():
+            return limit[0]
+
+        def emit(item):
+            key, cost = item
+            heapq.heappush(best, (-cost, _Rev(key)))
+            if len(best) > k:
+                heapq.heappop(best)
+            if len(best) == k:
+                limit[0] = min(limit[0], -best[0][0])
+
+        first = [float(i) for i in range(len(word) + 1)]
+        if _VALUES in self.root and first[-1] <= bound():
+            emit(("", first[-1]))
+        self._walk(self.root, "", word, first, bound, emit)
+        return sorted(((r.key, -c) for c, r in best), key=lambda x: (x[1], x[0]))
+
+    def _walk(self, node, key, word, prev, bound, emit):
+        n = len(word)
+        for ch, child in node.items():
+            if ch == _VALUES:
+                continue
+            row = _dp_row(prev, word, ch)
+            limit = bound()
+            if _VALUES in child and row[n] <= limit:
+                emit((key + ch, row[n]))
+                limit = bound()
+            if min(row) <= limit:
+                self._walk(child, key + ch, word, row, bound, emit)
+
+
+class _Rev:
+    """nearest'in yığınında eşit uzaklıkta alfabetik olarak büyük anahtarın önce atılması için."""
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return self.key > other.key